@@ -32,12 +32,10 @@ class MLMonitorStatus:
         self.min_samples_adaptive = 50
         
     def load_ml_data(self) -> Dict[str, Any]:
-        """Load ML data from JSON file."""
+        """Load ML data from JSON file and the journal appended since it was written."""
         try:
-            if self.ml_data_file.exists():
-                with open(self.ml_data_file, 'r') as f:
-                    return json.load(f)
-            return {}
+            from src.ml_predictive_engine import load_ml_data
+            return load_ml_data(str(self.ml_data_file))
         except Exception as e:
             print(f"Error loading ML data: {e}")
             return {}
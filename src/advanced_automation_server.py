@@ -27,6 +27,8 @@ import numpy as np
 from PIL import Image, ImageGrab
 import threading
 import asyncio
+import base64
+import uuid
 import win32gui
 import win32con
 import win32process
@@ -356,9 +358,101 @@ async def capture_screen(save_path: str = "screenshot.png") -> str:
     except Exception as e:
         return f"❌ Error capturing screen: {str(e)}"
 
+# Long-lived PowerShell process that run_powershell feeds scripts to over
+# stdin; starting powershell.exe costs hundreds of milliseconds per call
+powershell_session = None
+powershell_lock = None
+
+# Runs one base64-encoded script in a child scope of the session, with the
+# current location saved and restored around it. The finally block prints the
+# script's output, its error records and "ok" (or "exit" when the script
+# called exit, which ends the session), each followed by the marker line.
+POWERSHELL_WRAPPER = (
+    "$__result = [Collections.Generic.List[object]]::new(); $__done = $false; Push-Location; "
+    "try {{ & ([scriptblock]::Create([Text.Encoding]::UTF8.GetString("
+    "[Convert]::FromBase64String('{script}')))) 2>&1 | ForEach-Object {{ $__result.Add($_) }}; $__done = $true }} "
+    "catch {{ $__result.Add($_); $__done = $true }} "
+    "finally {{ Pop-Location; "
+    "$__result | Where-Object {{ $_ -isnot [Management.Automation.ErrorRecord] }} | Out-String -Width 4096; "
+    "Write-Output '{marker}'; "
+    "$__result | Where-Object {{ $_ -is [Management.Automation.ErrorRecord] }} | Out-String -Width 4096; "
+    "Write-Output '{marker}'; "
+    "Write-Output $(if ($__done) {{ 'ok' }} else {{ 'exit' }}); "
+    "Write-Output '{marker}' }}\n"
+)
+
+async def get_powershell_session():
+    """Return the shared PowerShell process, starting it if needed"""
+    global powershell_session
+    if powershell_session is None or powershell_session.returncode is not None:
+        powershell_session = await asyncio.create_subprocess_exec(
+            "powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        powershell_session.stdin.write(b"[Console]::OutputEncoding = [Text.Encoding]::UTF8\n")
+    return powershell_session
+
+async def execute_powershell(script: str, timeout: float = 30) -> Tuple[str, str]:
+    """Run a script in the shared PowerShell process, returning (output, errors)"""
+    global powershell_session, powershell_lock
+    if powershell_lock is None:
+        powershell_lock = asyncio.Lock()
+    
+    async with powershell_lock:
+        session = await get_powershell_session()
+        marker = f"__mcp_end_{uuid.uuid4().hex}__"
+        encoded = base64.b64encode(script.encode('utf-8')).decode('ascii')
+        session.stdin.write(POWERSHELL_WRAPPER.format(script=encoded, marker=marker).encode('utf-8'))
+        
+        async def read_section() -> str:
+            lines = []
+            while True:
+                line = await session.stdout.readline()
+                if not line:
+                    raise EOFError("PowerShell session exited")
+                line = line.decode('utf-8', errors='replace')
+                if line.strip() == marker:
+                    return "".join(lines).strip()
+                lines.append(line)
+        
+        async def read_reply() -> Tuple[str, str, str]:
+            return await read_section(), await read_section(), await read_section()
+        
+        try:
+            await session.stdin.drain()
+            # One deadline for the whole reply, not one per section
+            output, errors, status = await asyncio.wait_for(read_reply(), timeout)
+        except EOFError:
+            # The session ended before reporting back, as when the script
+            # calls exit and its output can't be flushed; not an error
+            powershell_session = None
+            return "", ""
+        except BaseException:
+            # The session is mid-script or gone; start a fresh one next call
+            if session.returncode is None:
+                session.kill()
+            powershell_session = None
+            raise
+        if status != "ok":
+            # The script called exit and the session is shutting down; its
+            # output still counts, and the next call starts a new session
+            if session.returncode is None:
+                session.kill()
+            powershell_session = None
+        return output, errors
+
 @mcp.tool()
 async def run_powershell(script: str) -> str:
-    """Execute PowerShell command or script"""
+    """Execute PowerShell command or script
+    
+    Scripts run in one long-lived session started with -NoProfile, so user
+    profile scripts are not loaded. Each script gets its own scope and
+    working directory, but session-wide state such as $env: variables,
+    imported modules, $global: variables and preference variables carries
+    over to later calls until the session is restarted (e.g. by exit).
+    """
     try:
         log_automation_action("run_powershell", {"script": script[:100] + "..." if len(script) > 100 else script})
         
@@ -371,21 +465,14 @@ async def run_powershell(script: str) -> str:
         if any(danger in script for danger in dangerous_commands):
             return f"❌ BLOCKED: Potentially dangerous PowerShell command: {script}"
         
-        # Execute PowerShell script
-        result = subprocess.run(
-            ["powershell", "-Command", script],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        output = result.stdout.strip()
-        if result.stderr:
-            output += f"\nErrors: {result.stderr.strip()}"
+        # Execute PowerShell script in the shared session
+        output, errors = await execute_powershell(script, timeout=30)
+        if errors:
+            output += f"\nErrors: {errors}"
         
         return f"✓ PowerShell executed:\n{output}"
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"❌ PowerShell script timed out: {script}"
     except Exception as e:
         return f"❌ Error running PowerShell: {str(e)}"
@@ -641,6 +728,24 @@ async def automate_workflow(workflow_name: str, steps: List[Dict]) -> str:
             elif action == "wait":
                 time.sleep(params.get("seconds", 1))
                 result += f"✓ Waited {params.get('seconds', 1)} seconds"
+            elif action == "wait_for_window":
+                # Poll for the window instead of sleeping a fixed amount
+                title = params.get("title", "")
+                timeout = params.get("timeout", 2.0)
+                start = time.monotonic()
+                deadline = start + timeout
+                found = False
+                while True:
+                    if gw.getWindowsWithTitle(title):
+                        found = True
+                        break
+                    if time.monotonic() >= deadline:
+                        break
+                    await asyncio.sleep(0.05)
+                if found:
+                    result += f"✓ Window '{title}' ready after {time.monotonic() - start:.2f} seconds"
+                else:
+                    result += f"❌ Timed out after {timeout} seconds waiting for window: {title}"
             elif action == "hotkey":
                 keys = params.get("keys", [])
                 pyautogui.hotkey(*keys)
@@ -7,7 +7,8 @@ Provides a user-friendly interface for all MCP server features
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import asyncio
-import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import json
 from pathlib import Path
 import sys
@@ -27,6 +28,22 @@ except ImportError as e:
     print("Make sure unified_server.py is in the same directory")
     sys.exit(1)
 
+# Prefixes written ahead of each result in the output areas
+OUTPUT_PREFIXES = {
+    'set': '✓ ',
+    'music': '🎵 ',
+    'playlist_add': '📝 ',
+    'list': '📋 ',
+    'search': '🔍 ',
+    'launch': '🚀 ',
+    'command': '💻 ',
+    'system_info': '🖥️ System Information:\n',
+    'processes': '🔄 Running Processes:\n',
+    'startup': '🚀 Startup Programs:\n',
+    'installed': '📱 Installed Programs:\n',
+    'all_preferences': '📋 All Preferences:\n',
+}
+
 class MCPServerGUI:
     def __init__(self, root):
         self.root = root
@@ -34,6 +51,12 @@ class MCPServerGUI:
         self.root.geometry("1200x800")
         self.root.configure(bg='#2b2b2b')
         
+        # Last trigger time per command, used to debounce repeated clicks/keys
+        self._last_fired = {}
+        
+        # Shared workers for MCP calls so clicks don't each spawn a thread
+        self._pool = ThreadPoolExecutor(max_workers=4)
+        
         # Configure styles
         self.setup_styles()
         
@@ -67,6 +90,16 @@ class MCPServerGUI:
         style.configure('TButton', background='#404040', foreground='white')
         style.configure('TEntry', fieldbackground='#404040', foreground='white')
         
+        # Plain Tk widgets (output areas, dialogs) pick their colors up from the
+        # option database instead of per-widget keyword arguments
+        for pattern, value in {
+            '*Text.background': '#1e1e1e',
+            '*Text.foreground': 'white',
+            '*Text.insertBackground': 'white',
+            '*Toplevel.background': '#2b2b2b',
+        }.items():
+            self.root.option_add(pattern, value)
+        
     def create_music_tab(self):
         """Create the music control tab"""
         music_frame = ttk.Frame(self.notebook)
@@ -117,9 +150,7 @@ class MCPServerGUI:
                   command=self.search_youtube).pack(side='left', padx=5)
         
         # Output area
-        self.music_output = scrolledtext.ScrolledText(playlist_frame, height=15, 
-                                                     bg='#1e1e1e', fg='white', 
-                                                     insertbackground='white')
+        self.music_output = scrolledtext.ScrolledText(playlist_frame, height=15)
         self.music_output.pack(fill='both', expand=True, pady=(10, 0))
         
     def create_system_tab(self):
@@ -141,9 +172,7 @@ class MCPServerGUI:
                   command=lambda: self.system_output.delete(1.0, tk.END)).pack(side='left', padx=5)
         
         # Output area
-        self.system_output = scrolledtext.ScrolledText(system_frame, height=35, 
-                                                      bg='#1e1e1e', fg='white', 
-                                                      insertbackground='white')
+        self.system_output = scrolledtext.ScrolledText(system_frame, height=35)
         self.system_output.pack(fill='both', expand=True, padx=10, pady=5)
         
     def create_apps_tab(self):
@@ -182,9 +211,7 @@ class MCPServerGUI:
                       command=lambda a=app: self.quick_open_app(a)).grid(row=i//4, column=i%4, padx=5, pady=2)
         
         # Output area
-        self.apps_output = scrolledtext.ScrolledText(apps_frame, height=30, 
-                                                    bg='#1e1e1e', fg='white', 
-                                                    insertbackground='white')
+        self.apps_output = scrolledtext.ScrolledText(apps_frame, height=30)
         self.apps_output.pack(fill='both', expand=True, padx=10, pady=5)
         
     def create_preferences_tab(self):
@@ -232,9 +259,7 @@ class MCPServerGUI:
                   command=self.list_preferences).grid(row=0, column=5, padx=(10, 0))
         
         # Output area
-        self.pref_output = scrolledtext.ScrolledText(pref_frame, height=25, 
-                                                    bg='#1e1e1e', fg='white', 
-                                                    insertbackground='white')
+        self.pref_output = scrolledtext.ScrolledText(pref_frame, height=25)
         self.pref_output.pack(fill='both', expand=True, padx=10, pady=5)
         
     def create_command_tab(self):
@@ -279,9 +304,7 @@ class MCPServerGUI:
             quick_cmd_frame.grid_columnconfigure(i, weight=1)
         
         # Output area
-        self.cmd_output = scrolledtext.ScrolledText(cmd_frame, height=25, 
-                                                   bg='#1e1e1e', fg='white', 
-                                                   insertbackground='white')
+        self.cmd_output = scrolledtext.ScrolledText(cmd_frame, height=25)
         self.cmd_output.pack(fill='both', expand=True, padx=10, pady=5)
         
     def run_async(self, func, *args, **kwargs):
@@ -306,6 +329,23 @@ class MCPServerGUI:
         
         return run_in_thread()
     
+    def shutdown(self):
+        """Stop the worker pool, dropping any calls that haven't started yet"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _append_output(self, widget, *parts):
+        """Append the joined parts to an output area and scroll to the end"""
+        widget.insert(tk.END, ''.join(parts))
+        widget.see(tk.END)
+    
+    def _debounced(self, key, ms=250):
+        """Return False if the same trigger already fired within the last `ms` milliseconds"""
+        now = time.monotonic() * 1000
+        if now - self._last_fired.get(key, 0) < ms:
+            return False
+        self._last_fired[key] = now
+        return True
+    
     # Music tab methods
     def set_favorite_song(self):
         song = self.fav_song_var.get().strip()
@@ -316,19 +356,17 @@ class MCPServerGUI:
         def execute():
             result = self.run_async(set_user_preference, 'music', 'favorite_song', song)
             if result:
-                self.music_output.insert(tk.END, f"✓ {result}\n")
-                self.music_output.see(tk.END)
+                self._append_output(self.music_output, OUTPUT_PREFIXES['set'], result, '\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def play_favorite(self):
         def execute():
             result = self.run_async(play_favorite_song)
             if result:
-                self.music_output.insert(tk.END, f"🎵 {result}\n")
-                self.music_output.see(tk.END)
+                self._append_output(self.music_output, OUTPUT_PREFIXES['music'], result, '\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def add_to_playlist_gui(self):
         song = self.add_song_var.get().strip()
@@ -339,20 +377,18 @@ class MCPServerGUI:
         def execute():
             result = self.run_async(add_to_playlist, song)
             if result:
-                self.music_output.insert(tk.END, f"📝 {result}\n")
-                self.music_output.see(tk.END)
+                self._append_output(self.music_output, OUTPUT_PREFIXES['playlist_add'], result, '\n')
                 self.add_song_var.set("")
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def show_playlist(self):
         def execute():
             result = self.run_async(show_playlist)
             if result:
-                self.music_output.insert(tk.END, f"📋 {result}\n\n")
-                self.music_output.see(tk.END)
+                self._append_output(self.music_output, OUTPUT_PREFIXES['list'], result, '\n\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def search_youtube(self):
         query = self.youtube_var.get().strip()
@@ -363,76 +399,71 @@ class MCPServerGUI:
         def execute():
             result = self.run_async(open_youtube_with_search, query)
             if result:
-                self.music_output.insert(tk.END, f"🔍 {result}\n")
-                self.music_output.see(tk.END)
+                self._append_output(self.music_output, OUTPUT_PREFIXES['search'], result, '\n')
                 self.youtube_var.set("")
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     # System tab methods
     def get_system_info(self):
         def execute():
             result = self.run_async(get_system_info)
             if result:
-                self.system_output.insert(tk.END, f"🖥️ System Information:\n{result}\n\n")
-                self.system_output.see(tk.END)
+                self._append_output(self.system_output, OUTPUT_PREFIXES['system_info'], result, '\n\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def list_processes(self):
         def execute():
             result = self.run_async(list_processes)
             if result:
-                self.system_output.insert(tk.END, f"🔄 Running Processes:\n{result}\n\n")
-                self.system_output.see(tk.END)
+                self._append_output(self.system_output, OUTPUT_PREFIXES['processes'], result, '\n\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def get_startup_programs(self):
         def execute():
             result = self.run_async(get_startup_programs)
             if result:
-                self.system_output.insert(tk.END, f"🚀 Startup Programs:\n{result}\n\n")
-                self.system_output.see(tk.END)
+                self._append_output(self.system_output, OUTPUT_PREFIXES['startup'], result, '\n\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     # Apps tab methods
     def get_installed_programs(self):
         def execute():
             result = self.run_async(get_installed_programs)
             if result:
-                self.apps_output.insert(tk.END, f"📱 Installed Programs:\n{result}\n\n")
-                self.apps_output.see(tk.END)
+                self._append_output(self.apps_output, OUTPUT_PREFIXES['installed'], result, '\n\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def quick_open_app(self, app_name):
+        if not self._debounced(('app', app_name)):
+            return
+        
         def execute():
             result = self.run_async(open_app_with_url, app_name)
             if result:
-                self.apps_output.insert(tk.END, f"🚀 {result}\n")
-                self.apps_output.see(tk.END)
+                self._append_output(self.apps_output, OUTPUT_PREFIXES['launch'], result, '\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def show_open_app_dialog(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Open Application")
-        dialog.geometry("400x150")
-        dialog.configure(bg='#2b2b2b')
+        
+        # Size is fixed, so center from the screen size without a layout pass
+        width, height = 400, 150
+        x = (dialog.winfo_screenwidth() - width) // 2
+        y = (dialog.winfo_screenheight() - height) // 2
+        dialog.geometry(f"{width}x{height}+{x}+{y}")
         dialog.resizable(False, False)
         
         # Make dialog modal
         dialog.transient(self.root)
         dialog.grab_set()
         
-        # Center the dialog
-        dialog.update_idletasks()
-        x = (dialog.winfo_screenwidth() // 2) - (dialog.winfo_width() // 2)
-        y = (dialog.winfo_screenheight() // 2) - (dialog.winfo_height() // 2)
-        dialog.geometry(f"+{x}+{y}")
-        
         # App name
         ttk.Label(dialog, text="Application Name:").pack(pady=10)
         app_var = tk.StringVar()
@@ -458,10 +489,9 @@ class MCPServerGUI:
             def execute():
                 result = self.run_async(open_app_with_url, app_name, url)
                 if result:
-                    self.apps_output.insert(tk.END, f"🚀 {result}\n")
-                    self.apps_output.see(tk.END)
+                    self._append_output(self.apps_output, OUTPUT_PREFIXES['launch'], result, '\n')
             
-            threading.Thread(target=execute).start()
+            self._pool.submit(execute)
             dialog.destroy()
         
         ttk.Button(btn_frame, text="Open", command=open_app).pack(side='left', padx=5)
@@ -480,14 +510,13 @@ class MCPServerGUI:
         def execute():
             result = self.run_async(set_user_preference, category, key, value)
             if result:
-                self.pref_output.insert(tk.END, f"✓ {result}\n")
-                self.pref_output.see(tk.END)
+                self._append_output(self.pref_output, OUTPUT_PREFIXES['set'], result, '\n')
                 # Clear the fields
                 self.pref_category_var.set("")
                 self.pref_key_var.set("")
                 self.pref_value_var.set("")
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def get_preference(self):
         category = self.get_category_var.get().strip()
@@ -500,19 +529,17 @@ class MCPServerGUI:
         def execute():
             result = self.run_async(get_user_preference, category, key)
             if result:
-                self.pref_output.insert(tk.END, f"📋 {result}\n")
-                self.pref_output.see(tk.END)
+                self._append_output(self.pref_output, OUTPUT_PREFIXES['list'], result, '\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def list_preferences(self):
         def execute():
             result = self.run_async(list_user_preferences)
             if result:
-                self.pref_output.insert(tk.END, f"📋 All Preferences:\n{result}\n\n")
-                self.pref_output.see(tk.END)
+                self._append_output(self.pref_output, OUTPUT_PREFIXES['all_preferences'], result, '\n\n')
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     # Command tab methods
     def execute_command(self):
@@ -521,14 +548,17 @@ class MCPServerGUI:
             messagebox.showwarning("Warning", "Please enter a command")
             return
         
+        # Quick Command buttons route through here too, so this covers both
+        if not self._debounced(('cmd', command)):
+            return
+        
         def execute():
             result = self.run_async(run_command, command)
             if result:
-                self.cmd_output.insert(tk.END, f"💻 {result}\n\n")
-                self.cmd_output.see(tk.END)
+                self._append_output(self.cmd_output, OUTPUT_PREFIXES['command'], result, '\n\n')
                 self.command_var.set("")
         
-        threading.Thread(target=execute).start()
+        self._pool.submit(execute)
     
     def quick_command(self, command):
         self.command_var.set(command)
@@ -540,6 +570,7 @@ def main():
     
     # Handle window close
     def on_closing():
+        app.shutdown()
         root.quit()
         root.destroy()
     
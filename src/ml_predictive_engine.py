@@ -7,20 +7,31 @@ system optimization, and smart automation recommendations.
 
 import os
 import json
+import atexit
+import time
 import pickle
 import logging
+import threading
 import pandas as pd
 import numpy as np
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, mean_squared_error
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.preprocessing import LabelEncoder
 import joblib
 import psutil
 
+# Optional: compiles the single-row tree walk used by CompiledForest
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 @dataclass
 class UserAction:
@@ -48,43 +59,410 @@ class SystemMetrics:
     timestamp: datetime
 
 
+def _to_python(value):
+    """Convert a NumPy scalar read from a column back to the plain Python type"""
+    if isinstance(value, np.floating):
+        # str() gives the shortest repr for the stored precision, so a
+        # float32 9.6 comes back as 9.6 rather than 9.600000381469727
+        return float(str(value))
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class RecordColumns:
+    """Column-oriented storage for dataclass records
+    
+    Each field is kept in its own NumPy array, grown by amortized doubling, so
+    training and analytics code can work on whole columns. The container still
+    behaves like the list of records it replaces: len(), indexing, slicing,
+    iteration and append() all deal in record objects.
+    """
+    
+    record_type = None
+    dtypes: Dict[str, object] = {}
+    # Extra columns computed from each record as it is appended:
+    # name -> (dtype, function of (columns, record))
+    derived: Dict[str, Tuple[object, Callable]] = {}
+    
+    def __init__(self, records=()):
+        self._size = 0
+        self._capacity = 0
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in self.dtypes.items()}
+        for name, (dtype, _) in self.derived.items():
+            self._columns[name] = np.empty(0, dtype=dtype)
+        self.extend(records)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __iter__(self):
+        for i in range(self._size):
+            yield self._record_at(i)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record_at(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("record index out of range")
+        return self._record_at(index)
+    
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one field across all stored records"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+    
+    def append(self, record):
+        if self._size == self._capacity:
+            self._grow(self._size + 1)
+        for name in self.dtypes:
+            self._columns[name][self._size] = getattr(record, name)
+        for name, (_, compute) in self.derived.items():
+            self._columns[name][self._size] = compute(self, record)
+        self._size += 1
+    
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+    
+    def _grow(self, min_capacity: int):
+        capacity = max(16, 2 * self._capacity, min_capacity)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        self._capacity = capacity
+    
+    def _record_at(self, index: int):
+        return self.record_type(**{name: _to_python(self._columns[name][index])
+                                   for name in self.dtypes})
+
+
+class ActionColumns(RecordColumns):
+    """Column storage for UserAction records"""
+    
+    record_type = UserAction
+    dtypes = {
+        'timestamp': 'datetime64[us]',
+        'action_type': object,
+        'application': object,
+        'duration': np.float32,
+        'system_load': np.float32,
+        'memory_usage': np.float32,
+        'cpu_usage': np.float32,
+        'time_of_day': np.int8,
+        'day_of_week': np.int8,
+        'success': np.bool_,
+    }
+    # Action types are interned to small integer codes as they are recorded,
+    # so training can use them as labels without fitting a LabelEncoder
+    derived = {
+        'action_type_code': (
+            np.int32,
+            lambda columns, action: columns.action_type_codes.setdefault(
+                action.action_type, len(columns.action_type_codes)),
+        ),
+    }
+    
+    def __init__(self, records=()):
+        # Action type -> code, in first-seen order
+        self.action_type_codes: Dict[str, int] = {}
+        # Running tallies for the recommendation engine, kept up to date on
+        # append so recommendations never rescan the whole history:
+        # (action_type, application) -> count, and hour -> action_type -> count
+        self.action_frequency: Counter = Counter()
+        self.hourly_actions: Dict[int, Counter] = defaultdict(Counter)
+        super().__init__(records)
+    
+    def append(self, action):
+        super().append(action)
+        self.action_frequency[(action.action_type, action.application)] += 1
+        self.hourly_actions[action.time_of_day][action.action_type] += 1
+
+
+class MetricColumns(RecordColumns):
+    """Column storage for SystemMetrics records"""
+    
+    record_type = SystemMetrics
+    dtypes = {
+        'cpu_usage': np.float32,
+        'memory_usage': np.float32,
+        'disk_usage': np.float32,
+        # Cumulative byte counters overflow float32's precision
+        'network_usage': np.float64,
+        'active_processes': np.int32,
+        'timestamp': 'datetime64[us]',
+    }
+    # Calendar features used for training, so timestamps aren't re-read per run
+    derived = {
+        'hour': (np.int8, lambda columns, metric: metric.timestamp.hour),
+        'weekday': (np.int8, lambda columns, metric: metric.timestamp.weekday()),
+    }
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _sum_leaf_values(x, roots, left, right, feature, threshold, leaf_value):
+        """Walk every tree for one row and sum the values of the leaves reached"""
+        total = np.zeros(leaf_value.shape[1])
+        for root in roots:
+            node = root
+            while left[node] >= 0:
+                if x[feature[node]] <= threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            total += leaf_value[node]
+        return total
+
+
+class CompiledForest:
+    """Flattened, NumPy-only predictor for a fitted sklearn tree ensemble
+    
+    All trees' nodes are concatenated into contiguous arrays and evaluated
+    together: each step advances every (sample, tree) pair one level with a
+    handful of vectorized operations. This avoids sklearn's per-call
+    validation and per-tree dispatch, which dominate for the one-row
+    predictions made here. When numba is installed, single rows are walked
+    by a compiled loop instead. Supports RandomForestClassifier and
+    squared-error GradientBoostingRegressor.
+    """
+    
+    def __init__(self, roots, left, right, feature, threshold, leaf_value,
+                 depth, scale=None, offset=0.0, classes=None):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.leaf_value = leaf_value
+        self.depth = depth
+        # Regression output is offset + scale * sum(tree outputs); for
+        # classification the tree outputs are averaged instead
+        self.scale = scale
+        self.offset = offset
+        self.classes_ = classes
+    
+    @classmethod
+    def from_sklearn(cls, model) -> 'CompiledForest':
+        if hasattr(model, 'classes_'):
+            trees = [est.tree_ for est in model.estimators_]
+        else:
+            trees = [est.tree_ for est in np.ravel(model.estimators_)]
+        
+        sizes = [tree.node_count for tree in trees]
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int32)
+        
+        def shift(children, offset):
+            # Keep sklearn's -1 leaf marker, re-base real child indices
+            return np.where(children >= 0, children + offset, -1).astype(np.int32)
+        
+        # sklearn stores node indices and features as int64; int32/int16 is
+        # plenty here and halves the memory every walk has to touch
+        left = np.concatenate([shift(t.children_left, o) for t, o in zip(trees, offsets)])
+        right = np.concatenate([shift(t.children_right, o) for t, o in zip(trees, offsets)])
+        feature = np.concatenate([t.feature for t in trees]).astype(np.int16)
+        # Thresholds stay float64: sklearn compares float32 inputs against
+        # float64 midpoints, and rounding them could flip a split
+        threshold = np.concatenate([t.threshold for t in trees])
+        values = np.concatenate([t.value[:, 0, :] for t in trees])
+        depth = max(t.max_depth for t in trees)
+        
+        if hasattr(model, 'classes_'):
+            totals = values.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            return cls(offsets, left, right, feature, threshold,
+                       (values / totals).astype(np.float32), depth, classes=model.classes_)
+        
+        if isinstance(model.init_, str):  # init='zero'
+            offset = 0.0
+        else:
+            offset = float(model.init_.predict(np.zeros((1, model.n_features_in_)))[0])
+        return cls(offsets, left, right, feature, threshold, values.astype(np.float32),
+                   depth, scale=model.learning_rate, offset=offset)
+    
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Return the leaf node reached in every tree for every row of X"""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            left = self.left[nodes]
+            internal = left >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.right[nodes]), nodes)
+        return nodes
+    
+    def _leaf_sum(self, X: np.ndarray) -> np.ndarray:
+        """Sum over trees of the leaf values reached by each row of X"""
+        if NUMBA_AVAILABLE and len(X) == 1:
+            x = np.asarray(X, dtype=np.float32)[0]
+            return _sum_leaf_values(x, self.roots, self.left, self.right, self.feature,
+                                    self.threshold, self.leaf_value)[None, :]
+        # Leaf values are float32; accumulate in float64 like the compiled loop
+        return self.leaf_value[self._leaves(X)].sum(axis=1, dtype=np.float64)
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._leaf_sum(X) / len(self.roots)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self.classes_ is not None:
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return self.offset + self.scale * self._leaf_sum(X)[:, 0]
+
+def ml_journal_file(data_file: str = "ml_data.json") -> str:
+    """Path of the NDJSON journal that DataCollector appends to for data_file"""
+    return os.path.splitext(data_file)[0] + ".ndjson"
+
+def load_ml_data(data_file: str = "ml_data.json") -> Dict:
+    """Read collected ML data as {'actions': [...], 'metrics': [...]}
+    
+    data_file only holds records up to the last compaction; the rest are in
+    its journal, which is replayed on top. Records are plain dicts as stored,
+    with ISO timestamps. 'journal_entries' counts the replayed records.
+    """
+    data = {'actions': [], 'metrics': [], 'journal_entries': 0}
+    if os.path.exists(data_file):
+        with open(data_file, 'r') as f:
+            snapshot = json.load(f)
+        data['actions'].extend(snapshot.get('actions', []))
+        data['metrics'].extend(snapshot.get('metrics', []))
+    
+    journal_file = ml_journal_file(data_file)
+    if os.path.exists(journal_file):
+        with open(journal_file, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted write
+                    logging.warning(f"Skipping malformed journal line in {journal_file}")
+                    continue
+                data[entry['kind']].append(entry['data'])
+                data['journal_entries'] += 1
+    return data
+
 class DataCollector:
     """Collects and stores user interaction and system data"""
     
+    # Journal records appended before they are folded back into data_file
+    JOURNAL_COMPACT_EVERY = 1000
+    # Seconds a CPU/memory sample is reused across record_action calls
+    LOAD_SAMPLE_TTL = 0.5
+    # Seconds between background system metric polls
+    METRICS_POLL_INTERVAL = 1.0
+    
     def __init__(self, data_file: str = "ml_data.json"):
         self.data_file = data_file
-        self.actions: List[UserAction] = []
-        self.metrics: List[SystemMetrics] = []
-        self.load_data()
+        # New records are appended here one JSON object per line instead of
+        # rewriting data_file on every record; load_ml_data reads both
+        self.journal_file = ml_journal_file(data_file)
+        # History is read from disk on first access to actions/metrics rather
+        # than here, so creating a collector (including the module-level one
+        # built at import) doesn't parse the whole data file
+        self._actions = None
+        self._metrics = None
+        self._loaded = False
+        self._journal_entries = 0
+        atexit.register(self.close)
+        self._load_sample = None
+        self._load_sample_time = 0.0
+        # Latest (cpu, memory, disk, network bytes, process count) written by
+        # the poller thread, which starts on the first record_system_metrics
+        # and runs until close()
+        self._latest_metrics = None
+        self._metrics_lock = threading.Lock()
+        self._metrics_poller = None
+        self._metrics_stop = threading.Event()
+        # Prime psutil so later cpu_percent(interval=None) calls return the
+        # usage since the previous call instead of blocking to measure it
+        psutil.cpu_percent(interval=None)
+    
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            self._actions = ActionColumns()
+            self._metrics = MetricColumns()
+            self.load_data()
+    
+    @property
+    def actions(self) -> ActionColumns:
+        self._ensure_loaded()
+        return self._actions
+    
+    @actions.setter
+    def actions(self, records):
+        # Load first so the stored metrics aren't lost by a later lazy load
+        self._ensure_loaded()
+        # Callers may still assign a plain list of UserAction
+        self._actions = records if isinstance(records, ActionColumns) else ActionColumns(records)
+    
+    @property
+    def metrics(self) -> MetricColumns:
+        self._ensure_loaded()
+        return self._metrics
+    
+    @metrics.setter
+    def metrics(self, records):
+        self._ensure_loaded()
+        self._metrics = records if isinstance(records, MetricColumns) else MetricColumns(records)
+    
+    def _current_load(self) -> Tuple[float, float]:
+        """Return (cpu_percent, memory_percent), resampled at most every LOAD_SAMPLE_TTL seconds"""
+        # While the poller runs, reuse its sample: cpu_percent(interval=None)
+        # measures since the previous call, so a second caller would skew both
+        with self._metrics_lock:
+            latest = self._latest_metrics
+        if latest is not None:
+            return latest[0], latest[1]
+        now = time.monotonic()
+        if self._load_sample is None or now - self._load_sample_time > self.LOAD_SAMPLE_TTL:
+            self._load_sample = (psutil.cpu_percent(interval=None), psutil.virtual_memory().percent)
+            self._load_sample_time = now
+        return self._load_sample
     
     def record_action(self, action_type: str, application: str, duration: float, success: bool = True):
         """Record a user action"""
+        self.record_actions([(action_type, application, duration, success)])
+    
+    def record_actions(self, actions: List[Tuple]):
+        """Record several user actions at once
+        
+        Each entry is (action_type, application, duration[, success]); the
+        batch shares one timestamp and one system load reading.
+        """
         now = datetime.now()
         
         # Get system metrics
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        memory = psutil.virtual_memory()
-        
-        action = UserAction(
-            timestamp=now,
-            action_type=action_type,
-            application=application,
-            duration=duration,
-            system_load=cpu_percent,
-            memory_usage=memory.percent,
-            cpu_usage=cpu_percent,
-            time_of_day=now.hour,
-            day_of_week=now.weekday(),
-            success=success
-        )
+        cpu_percent, memory_percent = self._current_load()
         
-        self.actions.append(action)
-        self.save_data()
+        for action_type, application, duration, *rest in actions:
+            action = UserAction(
+                timestamp=now,
+                action_type=action_type,
+                application=application,
+                duration=duration,
+                system_load=cpu_percent,
+                memory_usage=memory_percent,
+                cpu_usage=cpu_percent,
+                time_of_day=now.hour,
+                day_of_week=now.weekday(),
+                success=rest[0] if rest else True
+            )
+            
+            self.actions.append(action)
+            self.append_record('actions', action)
     
-    def record_system_metrics(self):
-        """Record current system metrics"""
-        now = datetime.now()
-        
+    @staticmethod
+    def _sample_system() -> Tuple[float, float, float, float, int]:
+        """Poll psutil for (cpu, memory, disk, network bytes, process count)"""
         cpu_usage = psutil.cpu_percent()
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
@@ -97,53 +475,122 @@ class DataCollector:
         except:
             pass
         
+        return (cpu_usage, memory.percent, (disk.used / disk.total) * 100,
+                network_usage, len(psutil.pids()))
+    
+    def _poll_system_metrics(self):
+        """Poller thread: keep _latest_metrics fresh until close() is called"""
+        while not self._metrics_stop.is_set():
+            try:
+                sample = self._sample_system()
+                with self._metrics_lock:
+                    self._latest_metrics = sample
+            except Exception as e:
+                logging.error(f"Error polling system metrics: {e}")
+            self._metrics_stop.wait(self.METRICS_POLL_INTERVAL)
+    
+    def close(self):
+        """Stop the metrics poller"""
+        self._metrics_stop.set()
+        with self._metrics_lock:
+            poller, self._metrics_poller = self._metrics_poller, None
+        if poller is not None:
+            poller.join(timeout=self.METRICS_POLL_INTERVAL * 2)
+    
+    def record_system_metrics(self, fresh: bool = False):
+        """Record current system metrics
+        
+        The poller's latest sample is used unless fresh is True, in which case
+        psutil is queried now; use that when recording several rows within
+        one poll interval.
+        """
+        now = datetime.now()
+        
+        # Started under the lock and published only once running, since
+        # close() may be joining it from another thread (e.g. at exit)
+        with self._metrics_lock:
+            if self._metrics_poller is None and not self._metrics_stop.is_set():
+                poller = threading.Thread(target=self._poll_system_metrics,
+                                          name="system-metrics-poller", daemon=True)
+                poller.start()
+                self._metrics_poller = poller
+        
+        # Take the poller's latest sample; only the very first call, before
+        # the poller has written anything, queries psutil itself
+        latest = None
+        if not fresh:
+            with self._metrics_lock:
+                latest = self._latest_metrics
+        if latest is None:
+            latest = self._sample_system()
+        cpu_usage, memory_usage, disk_usage, network_usage, active_processes = latest
+        
         metrics = SystemMetrics(
-            cpu_usage=cpu_usage,
-            memory_usage=memory.percent,
-            disk_usage=(disk.used / disk.total) * 100,
-            network_usage=network_usage,
-            active_processes=len(psutil.pids()),
+            cpu_usage=float(cpu_usage),
+            memory_usage=float(memory_usage),
+            disk_usage=float(disk_usage),
+            network_usage=float(network_usage),
+            active_processes=int(active_processes),
             timestamp=now
         )
         
         self.metrics.append(metrics)
-        self.save_data()
+        self.append_record('metrics', metrics)
+    
+    @staticmethod
+    def _record_to_dict(record) -> Dict:
+        data = asdict(record)
+        data['timestamp'] = data['timestamp'].isoformat()
+        return data
+    
+    def append_record(self, kind: str, record):
+        """Append one record to the journal, compacting it into data_file when it grows"""
+        try:
+            line = json.dumps({'kind': kind, 'data': self._record_to_dict(record)})
+            # Opened per record so every record is on disk once this returns
+            with open(self.journal_file, 'a') as f:
+                f.write(line + '\n')
+            self._journal_entries += 1
+        except Exception as e:
+            logging.error(f"Error appending to journal: {e}")
+            return
+        
+        if self._journal_entries >= self.JOURNAL_COMPACT_EVERY:
+            self.save_data()
     
     def save_data(self):
         """Save collected data to file"""
         try:
             data = {
-                'actions': [asdict(action) for action in self.actions],
-                'metrics': [asdict(metric) for metric in self.metrics]
+                'actions': [self._record_to_dict(action) for action in self.actions],
+                'metrics': [self._record_to_dict(metric) for metric in self.metrics]
             }
             
-            # Convert datetime objects to strings
-            for action in data['actions']:
-                action['timestamp'] = action['timestamp'].isoformat()
-            
-            for metric in data['metrics']:
-                metric['timestamp'] = metric['timestamp'].isoformat()
-            
             with open(self.data_file, 'w') as f:
                 json.dump(data, f, indent=2)
+            
+            # Everything in the journal is now part of data_file
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            self._journal_entries = 0
         except Exception as e:
             logging.error(f"Error saving data: {e}")
     
+    def _load_record(self, kind: str, record_data: Dict):
+        record_data['timestamp'] = datetime.fromisoformat(record_data['timestamp'])
+        if kind == 'actions':
+            self.actions.append(UserAction(**record_data))
+        else:
+            self.metrics.append(SystemMetrics(**record_data))
+    
     def load_data(self):
         """Load data from file"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Convert back to dataclass objects
-                for action_data in data.get('actions', []):
-                    action_data['timestamp'] = datetime.fromisoformat(action_data['timestamp'])
-                    self.actions.append(UserAction(**action_data))
-                
-                for metric_data in data.get('metrics', []):
-                    metric_data['timestamp'] = datetime.fromisoformat(metric_data['timestamp'])
-                    self.metrics.append(SystemMetrics(**metric_data))
+            data = load_ml_data(self.data_file)
+            for kind in ('actions', 'metrics'):
+                for record_data in data[kind]:
+                    self._load_record(kind, record_data)
+            self._journal_entries = data['journal_entries']
         
         except Exception as e:
             logging.error(f"Error loading data: {e}")
@@ -154,13 +601,25 @@ class DataCollector:
 class UserBehaviorPredictor:
     """Predicts user behavior patterns"""
     
+    # UserAction columns fed to the model, in feature order
+    ACTION_FEATURES = ('time_of_day', 'day_of_week', 'system_load', 'memory_usage', 'cpu_usage', 'duration')
+    
     def __init__(self, data_collector: DataCollector):
         self.data_collector = data_collector
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.scaler = StandardScaler()
+        # Trees are built and evaluated in parallel; bounded depth keeps the
+        # per-prediction walk short
+        self.model = RandomForestClassifier(n_estimators=100, max_depth=16, n_jobs=-1, random_state=42)
         self.label_encoder = LabelEncoder()
+        # Action type names indexed by the codes train_model's labels use
+        self.action_types: List[str] = []
+        # Flattened copy of the trained forest used on the predict paths
+        self.compiled: Optional[CompiledForest] = None
         self.is_trained = False
-        self.model_file = "user_behavior_model.pkl"
+        # Tree ensembles are scale-invariant, so no scaler is fitted or saved.
+        # The name changed with that so older scaled-feature models aren't loaded.
+        self.model_file = "user_behavior_model_v2.pkl"
+        # Set once load_model has run, so a missing model file is only probed once
+        self._load_attempted = False
         
     def train_user_behavior_model(self, user_data: List[Dict]) -> Dict[str, any]:
         """Train user behavior model with enhanced data processing"""
@@ -173,32 +632,29 @@ class UserBehaviorPredictor:
             
             # Prepare features
             feature_columns = ['hour', 'day_of_week', 'application_usage', 'click_count', 'window_switches', 'keystroke_count', 'idle_time']
-            features = df[feature_columns].fillna(0).values
+            features = np.ascontiguousarray(
+                df[feature_columns].to_numpy(dtype=np.float32, na_value=0.0)
+            )
             
             # Use pattern as target if available, otherwise create synthetic targets
             if 'pattern' in df.columns:
                 labels = df['pattern'].values
             else:
-                # Create synthetic patterns based on usage intensity
-                labels = []
-                for _, row in df.iterrows():
-                    activity_score = row['click_count'] + row['window_switches'] + (row['keystroke_count'] / 10)
-                    if activity_score > 20:
-                        labels.append('high_activity')
-                    elif activity_score > 10:
-                        labels.append('medium_activity')
-                    else:
-                        labels.append('low_activity')
+                # Create synthetic patterns based on usage intensity:
+                # click_count + window_switches + keystroke_count / 10
+                activity_score = features[:, 3] + features[:, 4] + features[:, 5] / 10
+                labels = np.select(
+                    [activity_score > 20, activity_score > 10],
+                    ['high_activity', 'medium_activity'],
+                    default='low_activity'
+                )
             
             # Encode labels
             encoded_labels = self.label_encoder.fit_transform(labels)
             
-            # Scale features
-            scaled_features = self.scaler.fit_transform(features)
-            
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
-                scaled_features, encoded_labels, test_size=0.2, random_state=42
+                features, encoded_labels, test_size=0.2, random_state=42
             )
             
             # Train model
@@ -224,7 +680,7 @@ class UserBehaviorPredictor:
     def predict_user_behavior(self, context: Dict) -> Dict[str, any]:
         """Predict user behavior based on context"""
         try:
-            if not self.is_trained:
+            if not self.is_trained and not self._load_attempted:
                 self.load_model()
             
             if not self.is_trained:
@@ -241,15 +697,12 @@ class UserBehaviorPredictor:
                 context.get('idle_time', 30)
             ]
             
-            scaled_features = self.scaler.transform([feature_vector])
+            features = np.array([feature_vector], dtype=np.float32)
             
-            # Get prediction probabilities
-            probabilities = self.model.predict_proba(scaled_features)[0]
-            predicted_class = self.model.predict(scaled_features)[0]
+            probabilities, predicted_class, confidence = self._predict_top(features)
             
             # Decode prediction
             predicted_behavior = self.label_encoder.inverse_transform([predicted_class])[0]
-            confidence = max(probabilities)
             
             return {
                 "predicted_behavior": predicted_behavior,
@@ -267,22 +720,22 @@ class UserBehaviorPredictor:
             if not self.data_collector.actions:
                 return {"error": "No action data available"}
             
-            # Convert to DataFrame
-            actions_data = [asdict(action) for action in self.data_collector.actions]
-            df = pd.DataFrame(actions_data)
+            actions = self.data_collector.actions
             
             # Time-based patterns
-            hourly_activity = df.groupby('time_of_day').size().to_dict()
-            daily_activity = df.groupby('day_of_week').size().to_dict()
+            hourly_counts = np.bincount(actions.column('time_of_day'), minlength=24)
+            daily_counts = np.bincount(actions.column('day_of_week'), minlength=7)
+            hourly_activity = {hour: int(count) for hour, count in enumerate(hourly_counts) if count}
+            daily_activity = {day: int(count) for day, count in enumerate(daily_counts) if count}
             
             # Application usage patterns
-            app_usage = df['application'].value_counts().to_dict()
+            app_usage = dict(Counter(actions.column('application')).most_common())
             
             # Action type patterns
-            action_patterns = df['action_type'].value_counts().to_dict()
+            action_patterns = dict(Counter(actions.column('action_type')).most_common())
             
             # Success rate
-            success_rate = df['success'].mean() if 'success' in df.columns else 1.0
+            success_rate = float(actions.column('success').mean())
             
             return {
                 "hourly_activity": hourly_activity,
@@ -290,7 +743,7 @@ class UserBehaviorPredictor:
                 "app_usage": app_usage,
                 "action_patterns": action_patterns,
                 "success_rate": success_rate,
-                "total_actions": len(df),
+                "total_actions": len(actions),
                 "analysis_timestamp": datetime.now().isoformat()
             }
             
@@ -304,35 +757,30 @@ class UserBehaviorPredictor:
             if not self.is_trained or not self.data_collector.actions:
                 return []
             
+            actions = self.data_collector.actions
+            start = max(len(actions) - 100, 0)  # Last 100 actions
+            
+            # Score all recent actions with one predict_proba call
+            features = self._feature_matrix(actions, start)
+            probabilities = self._predict_proba(features)
+            max_probabilities = probabilities.max(axis=1)
+            
+            # Rows below the threshold are anomalies; most anomalous first
+            anomalous = np.nonzero(max_probabilities < threshold)[0]
+            anomalous = anomalous[np.argsort(max_probabilities[anomalous], kind='stable')]
+            
             anomalies = []
-            recent_actions = self.data_collector.actions[-100:]  # Last 100 actions
-            
-            for action in recent_actions:
-                # Create feature vector
-                feature_vector = [
-                    action.time_of_day,
-                    action.day_of_week,
-                    action.system_load,
-                    action.memory_usage,
-                    action.cpu_usage,
-                    action.duration
-                ]
-                
-                # Get prediction probability
-                scaled_features = self.scaler.transform([feature_vector])
-                probabilities = self.model.predict_proba(scaled_features)[0]
-                
-                # Check if probability is below threshold (anomaly)
-                if max(probabilities) < threshold:
-                    anomalies.append({
-                        "timestamp": action.timestamp.isoformat(),
-                        "action_type": action.action_type,
-                        "application": action.application,
-                        "anomaly_score": 1 - max(probabilities),
-                        "reason": "Unusual behavior pattern detected"
-                    })
-            
-            return sorted(anomalies, key=lambda x: x['anomaly_score'], reverse=True)
+            for row in anomalous:
+                action = actions[start + row]
+                anomalies.append({
+                    "timestamp": action.timestamp.isoformat(),
+                    "action_type": action.action_type,
+                    "application": action.application,
+                    "anomaly_score": 1 - max_probabilities[row],
+                    "reason": "Unusual behavior pattern detected"
+                })
+            
+            return anomalies
             
         except Exception as e:
             logging.error(f"Anomaly detection failed: {e}")
@@ -340,45 +788,38 @@ class UserBehaviorPredictor:
     
     def prepare_features(self, actions: List[UserAction]) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare features for ML model"""
-        if not actions:
+        if not len(actions):
             return np.array([]), np.array([])
         
-        features = []
-        labels = []
-        
-        for action in actions:
-            feature_vector = [
-                action.time_of_day,
-                action.day_of_week,
-                action.system_load,
-                action.memory_usage,
-                action.cpu_usage,
-                action.duration
-            ]
-            features.append(feature_vector)
-            labels.append(action.action_type)
+        if not isinstance(actions, ActionColumns):
+            actions = ActionColumns(actions)
         
-        return np.array(features), np.array(labels)
+        return self._feature_matrix(actions), actions.column('action_type')
+    
+    def _feature_matrix(self, actions: ActionColumns, start: int = 0) -> np.ndarray:
+        """Stack the feature columns of actions[start:] into a float32 matrix"""
+        return np.column_stack([
+            actions.column(name)[start:] for name in self.ACTION_FEATURES
+        ]).astype(np.float32, copy=False)
     
     def train_model(self, min_samples: int = 50) -> Dict[str, float]:
         """Train the user behavior prediction model"""
         if len(self.data_collector.actions) < min_samples:
             return {"error": f"Need at least {min_samples} samples, have {len(self.data_collector.actions)}"}
         
-        features, labels = self.prepare_features(self.data_collector.actions)
+        actions = self.data_collector.actions
+        features = self._feature_matrix(actions)
         
         if len(features) == 0:
             return {"error": "No features available for training"}
         
-        # Encode labels
-        encoded_labels = self.label_encoder.fit_transform(labels)
-        
-        # Scale features
-        scaled_features = self.scaler.fit_transform(features)
+        # Labels are the action type codes interned at record time
+        encoded_labels = actions.column('action_type_code')
+        self.action_types = list(actions.action_type_codes)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
-            scaled_features, encoded_labels, test_size=0.2, random_state=42
+            features, encoded_labels, test_size=0.2, random_state=42
         )
         
         # Train model
@@ -399,7 +840,7 @@ class UserBehaviorPredictor:
     
     def predict_next_action(self, current_context: Dict) -> Dict[str, any]:
         """Predict the most likely next action"""
-        if not self.is_trained:
+        if not self.is_trained and not self._load_attempted:
             self.load_model()
         
         if not self.is_trained:
@@ -420,15 +861,12 @@ class UserBehaviorPredictor:
                 current_context.get('duration', 0)
             ]
             
-            scaled_features = self.scaler.transform([feature_vector])
+            features = np.array([feature_vector], dtype=np.float32)
             
-            # Get prediction probabilities
-            probabilities = self.model.predict_proba(scaled_features)[0]
-            predicted_class = self.model.predict(scaled_features)[0]
+            _, predicted_class, confidence = self._predict_top(features)
             
             # Decode prediction
-            predicted_action = self.label_encoder.inverse_transform([predicted_class])[0]
-            confidence = max(probabilities)
+            predicted_action = self.action_types[predicted_class]
             
             return {
                 "predicted_action": predicted_action,
@@ -439,13 +877,32 @@ class UserBehaviorPredictor:
         except Exception as e:
             return {"error": str(e)}
     
+    def _predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities from the compiled forest, falling back to sklearn"""
+        if self.compiled is not None:
+            return self.compiled.predict_proba(features)
+        return self.model.predict_proba(features)
+    
+    def _predict_top(self, features: np.ndarray):
+        """Return (probabilities, predicted class, confidence) for a single row
+        
+        predict() is just an argmax over predict_proba(), so the class is taken
+        from the probabilities rather than walking the forest a second time.
+        """
+        probabilities = self._predict_proba(features)[0]
+        predicted_index = int(np.argmax(probabilities))
+        return probabilities, self.model.classes_[predicted_index], probabilities[predicted_index]
+    
     def save_model(self):
         """Save trained model"""
+        self.compiled = None
         try:
+            self.compiled = CompiledForest.from_sklearn(self.model)
             model_data = {
                 'model': self.model,
-                'scaler': self.scaler,
+                'compiled': self.compiled,
                 'label_encoder': self.label_encoder,
+                'action_types': self.action_types,
                 'is_trained': self.is_trained
             }
             joblib.dump(model_data, self.model_file)
@@ -454,12 +911,15 @@ class UserBehaviorPredictor:
     
     def load_model(self):
         """Load trained model"""
+        self._load_attempted = True
         try:
             if os.path.exists(self.model_file):
-                model_data = joblib.load(self.model_file)
+                # Memory-map the estimator arrays instead of copying them in
+                model_data = joblib.load(self.model_file, mmap_mode='r')
                 self.model = model_data['model']
-                self.scaler = model_data['scaler']
+                self.compiled = model_data.get('compiled')
                 self.label_encoder = model_data['label_encoder']
+                self.action_types = model_data.get('action_types', [])
                 self.is_trained = model_data['is_trained']
         except Exception as e:
             logging.error(f"Error loading model: {e}")
@@ -469,40 +929,36 @@ class UserBehaviorPredictor:
 class SystemOptimizer:
     """Optimizes system performance using ML predictions"""
     
+    # MetricColumns columns fed to the model, in feature order
+    METRIC_FEATURES = ('cpu_usage', 'memory_usage', 'disk_usage', 'active_processes', 'hour', 'weekday')
+    
     def __init__(self, data_collector: DataCollector):
         self.data_collector = data_collector
         self.model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-        self.scaler = StandardScaler()
+        # Flattened copy of the trained ensemble used on the predict path
+        self.compiled: Optional[CompiledForest] = None
         self.is_trained = False
-        self.model_file = "system_optimizer_model.pkl"
+        # Unscaled features, see UserBehaviorPredictor.model_file
+        self.model_file = "system_optimizer_model_v2.pkl"
+        # Set once load_model has run, so a missing model file is only probed once
+        self._load_attempted = False
     
     def prepare_features(self, metrics: List[SystemMetrics]) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare features for system optimization model"""
-        if not metrics:
+        if not len(metrics):
             return np.array([]), np.array([])
         
-        features = []
-        targets = []
+        if not isinstance(metrics, MetricColumns):
+            metrics = MetricColumns(metrics)
         
-        for i, metric in enumerate(metrics[:-1]):  # Skip last one for target
-            next_metric = metrics[i + 1]
-            
-            feature_vector = [
-                metric.cpu_usage,
-                metric.memory_usage,
-                metric.disk_usage,
-                metric.active_processes,
-                metric.timestamp.hour,
-                metric.timestamp.weekday()
-            ]
-            
-            # Target: next CPU usage (as optimization target)
-            target = next_metric.cpu_usage
-            
-            features.append(feature_vector)
-            targets.append(target)
+        # Each sample's features predict the next sample's CPU usage
+        # (as optimization target), so both are shifted column slices
+        features = np.column_stack([
+            metrics.column(name)[:-1] for name in self.METRIC_FEATURES
+        ]).astype(np.float32, copy=False)
+        targets = metrics.column('cpu_usage')[1:].astype(np.float32)
         
-        return np.array(features), np.array(targets)
+        return features, targets
     
     def train_model(self, min_samples: int = 100) -> Dict[str, float]:
         """Train system optimization model"""
@@ -514,12 +970,9 @@ class SystemOptimizer:
         if len(features) == 0:
             return {"error": "No features available for training"}
         
-        # Scale features
-        scaled_features = self.scaler.fit_transform(features)
-        
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
-            scaled_features, targets, test_size=0.2, random_state=42
+            features, targets, test_size=0.2, random_state=42
         )
         
         # Train model
@@ -548,12 +1001,9 @@ class SystemOptimizer:
         if len(features) == 0:
             return {"error": "No features available for training"}
         
-        # Scale features
-        scaled_features = self.scaler.fit_transform(features)
-        
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
-            scaled_features, targets, test_size=0.2, random_state=42
+            features, targets, test_size=0.2, random_state=42
         )
         
         # Train model
@@ -574,7 +1024,7 @@ class SystemOptimizer:
 
     def predict_system_load(self, current_system_metrics=None) -> Dict[str, any]:
         """Predict future system load"""
-        if not self.is_trained:
+        if not self.is_trained and not self._load_attempted:
             self.load_model()
         
         if not self.is_trained:
@@ -601,8 +1051,8 @@ class SystemOptimizer:
                 now.weekday()
             ]
             
-            scaled_features = self.scaler.transform([feature_vector])
-            predicted_load = self.model.predict(scaled_features)[0]
+            features = np.array([feature_vector], dtype=np.float32)
+            predicted_load = self._predict(features)[0]
             
             return {
                 "predicted_cpu_load": predicted_load,
@@ -613,12 +1063,20 @@ class SystemOptimizer:
         except Exception as e:
             return {"error": str(e)}
     
+    def _predict(self, features: np.ndarray) -> np.ndarray:
+        """Predicted load from the compiled ensemble, falling back to sklearn"""
+        if self.compiled is not None:
+            return self.compiled.predict(features)
+        return self.model.predict(features)
+    
     def save_model(self):
         """Save trained model"""
+        self.compiled = None
         try:
+            self.compiled = CompiledForest.from_sklearn(self.model)
             model_data = {
                 'model': self.model,
-                'scaler': self.scaler,
+                'compiled': self.compiled,
                 'is_trained': self.is_trained
             }
             joblib.dump(model_data, self.model_file)
@@ -627,11 +1085,13 @@ class SystemOptimizer:
     
     def load_model(self):
         """Load trained model"""
+        self._load_attempted = True
         try:
             if os.path.exists(self.model_file):
-                model_data = joblib.load(self.model_file)
+                # Memory-map the estimator arrays instead of copying them in
+                model_data = joblib.load(self.model_file, mmap_mode='r')
                 self.model = model_data['model']
-                self.scaler = model_data['scaler']
+                self.compiled = model_data.get('compiled')
                 self.is_trained = model_data['is_trained']
         except Exception as e:
             logging.error(f"Error loading model: {e}")
@@ -653,19 +1113,9 @@ class AutomationRecommendationEngine:
         if len(self.data_collector.actions) < 10:
             return [{"recommendation": "Collect more usage data for better recommendations"}]
         
-        # Common patterns analysis
-        action_frequency = {}
-        for action in self.data_collector.actions:
-            key = f"{action.action_type}_{action.application}"
-            action_frequency[key] = action_frequency.get(key, 0) + 1
-        
-        # Sort by frequency
-        sorted_actions = sorted(action_frequency.items(), key=lambda x: x[1], reverse=True)
-        
-        # Generate recommendations
-        for action_key, frequency in sorted_actions[:5]:
-            action_type, application = action_key.split('_', 1)
-            
+        # Common patterns analysis, from the tallies kept by the action store
+        actions = self.data_collector.actions
+        for (action_type, application), frequency in actions.action_frequency.most_common(5):
             if frequency > 5:  # Frequent action
                 recommendations.append({
                     "type": "automation",
@@ -676,16 +1126,9 @@ class AutomationRecommendationEngine:
                 })
         
         # Time-based recommendations
-        time_patterns = {}
-        for action in self.data_collector.actions:
-            hour = action.time_of_day
-            if hour not in time_patterns:
-                time_patterns[hour] = []
-            time_patterns[hour].append(action.action_type)
-        
-        for hour, actions in time_patterns.items():
-            if len(actions) > 3:  # Active hour
-                most_common = max(set(actions), key=actions.count)
+        for hour, counts in actions.hourly_actions.items():
+            if sum(counts.values()) > 3:  # Active hour
+                most_common = counts.most_common(1)[0][0]
                 recommendations.append({
                     "type": "schedule",
                     "hour": hour,
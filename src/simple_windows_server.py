@@ -5,27 +5,124 @@ A streamlined MCP server for basic Windows operations
 """
 
 import os
-import subprocess
+import re
 import sys
 import platform
 import json
+import asyncio
+import locale
+import shlex
+import shutil
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from mcp.server.fastmcp import FastMCP
 
 # Initialize FastMCP server
 mcp = FastMCP("simple-windows-server")
 
+# Platform details and the logged-in identity don't change while the server
+# runs, and platform.processor() is slow on Windows, so read them once
+PLATFORM_INFO = {
+    'system': platform.system(),
+    'release': platform.release(),
+    'machine': platform.machine(),
+    'processor': platform.processor(),
+    'user': os.getenv('USERNAME', 'Unknown'),
+    'computer': os.getenv('COMPUTERNAME', 'Unknown'),
+}
+
+# Commands run_command refuses, matched as whole words in one regex pass
+DANGEROUS_COMMAND_RE = re.compile(
+    r'\b(?:format|fdisk|del\s+/s|rmdir\s+/s|shutdown|restart)\b',
+    re.IGNORECASE
+)
+
+# Variables reported by get_environment_variables
+IMPORTANT_ENV_VARS = (
+    'USERNAME', 'COMPUTERNAME', 'USERPROFILE', 'HOMEDRIVE', 'HOMEPATH',
+    'WINDIR', 'SYSTEMROOT', 'TEMP', 'TMP', 'PATH'
+)
+
+# Largest amount of text returned from a file read; anything longer is
+# cut off rather than loaded into memory whole
+MAX_READ_CHARS = 1 << 20
+
+# cmd.exe built-ins and operators only work when the command goes through
+# the shell; everything else is started directly without a cmd.exe process
+SHELL_BUILTINS = frozenset([
+    'assoc', 'call', 'cd', 'chdir', 'cls', 'copy', 'date', 'del', 'dir', 'echo',
+    'erase', 'ftype', 'md', 'mkdir', 'mklink', 'move', 'path', 'rd', 'ren',
+    'rename', 'rmdir', 'set', 'start', 'time', 'title', 'type', 'ver', 'vol'
+])
+SHELL_OPERATORS = ('|', '&', '<', '>', '^', '%')
+
+async def _communicate(proc, timeout: Optional[float]) -> Tuple[int, str, str]:
+    """Wait for a subprocess, returning (returncode, stdout, stderr).
+    
+    On timeout the process is killed and asyncio.TimeoutError is raised.
+    """
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    
+    # Same decoding subprocess.run(text=True) used
+    encoding = locale.getpreferredencoding(False)
+    return (proc.returncode,
+            stdout.decode(encoding, errors='replace'),
+            stderr.decode(encoding, errors='replace'))
+
+async def _run(args: List[str], timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run a program directly without blocking the event loop."""
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    return await _communicate(proc, timeout)
+
+async def _run_shell(command: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run a command line through the shell without blocking the event loop."""
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    return await _communicate(proc, timeout)
+
+async def _run_command(command: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run a user-supplied command line, only involving cmd.exe when it needs the shell."""
+    args = [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg
+            for arg in shlex.split(command, posix=False)]
+    if not args or args[0].lower() in SHELL_BUILTINS or any(op in command for op in SHELL_OPERATORS):
+        return await _run_shell(command, timeout)
+    # CreateProcess only searches PATH for .exe and can't start .cmd/.bat
+    # shims such as npm or code, so those (and anything unresolved) go
+    # through cmd.exe like before
+    program = shutil.which(args[0])
+    if program is None or program.lower().endswith(('.cmd', '.bat')):
+        return await _run_shell(command, timeout)
+    return await _run([program] + args[1:], timeout)
+
+def _read_text(path) -> Tuple[str, bool]:
+    """Read up to MAX_READ_CHARS of a UTF-8 file, returning (text, truncated)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read(MAX_READ_CHARS)
+        truncated = f.read(1) != ''
+    return content, truncated
+
 @mcp.tool()
 async def get_system_info() -> str:
     """Get basic Windows system information."""
     try:
         info = []
-        info.append(f"System: {platform.system()} {platform.release()}")
-        info.append(f"Machine: {platform.machine()}")
-        info.append(f"Processor: {platform.processor()}")
-        info.append(f"User: {os.getenv('USERNAME', 'Unknown')}")
-        info.append(f"Computer: {os.getenv('COMPUTERNAME', 'Unknown')}")
+        info.append(f"System: {PLATFORM_INFO['system']} {PLATFORM_INFO['release']}")
+        info.append(f"Machine: {PLATFORM_INFO['machine']}")
+        info.append(f"Processor: {PLATFORM_INFO['processor']}")
+        info.append(f"User: {PLATFORM_INFO['user']}")
+        info.append(f"Computer: {PLATFORM_INFO['computer']}")
         info.append(f"Current Directory: {os.getcwd()}")
         
         return "\\n".join(info)
@@ -37,25 +134,18 @@ async def run_command(command: str) -> str:
     """Run a Windows command safely."""
     try:
         # Basic safety check
-        dangerous_commands = ['format', 'fdisk', 'del /s', 'rmdir /s', 'shutdown', 'restart']
-        if any(danger in command.lower() for danger in dangerous_commands):
+        if DANGEROUS_COMMAND_RE.search(command):
             return f"ERROR: Dangerous command blocked: {command}"
         
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        output = result.stdout
-        if result.stderr:
-            output += f"\\nErrors: {result.stderr}"
+        _, stdout, stderr = await _run_command(command, timeout=10)
+        
+        output = stdout
+        if stderr:
+            output += f"\\nErrors: {stderr}"
             
         return f"Command: {command}\\nOutput: {output}"
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"Command timed out: {command}"
     except Exception as e:
         return f"Error running command: {str(e)}"
@@ -71,13 +161,16 @@ async def list_directory(path: str = ".") -> str:
         if not directory.is_dir():
             return f"Path is not a directory: {path}"
         
+        # scandir entries carry the type and (on Windows) size from the
+        # directory listing itself, so no extra stat() call per item
         items = []
-        for item in directory.iterdir():
-            if item.is_dir():
-                items.append(f"[DIR] {item.name}/")
-            else:
-                size = item.stat().st_size
-                items.append(f"[FILE] {item.name} ({size} bytes)")
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    items.append(f"[DIR] {entry.name}/")
+                else:
+                    size = entry.stat().st_size
+                    items.append(f"[FILE] {entry.name} ({size} bytes)")
         
         return f"Directory: {path}\\n" + "\\n".join(items)
         
@@ -95,9 +188,11 @@ async def read_file(file_path: str) -> str:
         if not path.is_file():
             return f"Path is not a file: {file_path}"
         
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # File I/O runs on a worker thread so it doesn't block the event loop
+        content, truncated = await asyncio.to_thread(_read_text, path)
         
+        if truncated:
+            content += f"\\n...[truncated after {MAX_READ_CHARS} characters]"
         return f"File: {file_path}\\n{content}"
         
     except Exception as e:
@@ -109,8 +204,7 @@ async def write_file(file_path: str, content: str) -> str:
     try:
         path = Path(file_path)
         
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        await asyncio.to_thread(path.write_text, content, encoding='utf-8')
         
         return f"File written successfully: {file_path}"
         
@@ -121,15 +215,8 @@ async def write_file(file_path: str, content: str) -> str:
 async def get_environment_variables() -> str:
     """Get Windows environment variables."""
     try:
-        important_vars = [
-            'USERNAME', 'COMPUTERNAME', 'USERPROFILE', 'HOMEDRIVE', 'HOMEPATH',
-            'WINDIR', 'SYSTEMROOT', 'TEMP', 'TMP', 'PATH'
-        ]
-        
-        vars_info = []
-        for var in important_vars:
-            value = os.getenv(var, 'Not Set')
-            vars_info.append(f"{var}: {value}")
+        env = os.environ
+        vars_info = [f"{var}: {env.get(var, 'Not Set')}" for var in IMPORTANT_ENV_VARS]
         
         return "Environment Variables:\\n" + "\\n".join(vars_info)
         
@@ -140,17 +227,11 @@ async def get_environment_variables() -> str:
 async def ping_host(hostname: str) -> str:
     """Ping a hostname or IP address."""
     try:
-        result = subprocess.run(
-            f"ping -n 4 {hostname}",
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
+        _, stdout, _ = await _run(["ping", "-n", "4", hostname], timeout=15)
         
-        return f"Ping {hostname}:\\n{result.stdout}"
+        return f"Ping {hostname}:\\n{stdout}"
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"Ping timeout for {hostname}"
     except Exception as e:
         return f"Error pinging {hostname}: {str(e)}"
@@ -170,10 +251,12 @@ async def get_disk_usage(drive: str = "C:") -> str:
         
         usage_percent = (used / total) * 100
         
-        return f"Disk Usage for {drive}\\n" + \
-               f"Total: {total_gb} GB\\n" + \
-               f"Used: {used_gb} GB ({usage_percent:.1f}%)\\n" + \
-               f"Free: {free_gb} GB"
+        return "\\n".join([
+            f"Disk Usage for {drive}",
+            f"Total: {total_gb} GB",
+            f"Used: {used_gb} GB ({usage_percent:.1f}%)",
+            f"Free: {free_gb} GB"
+        ])
         
     except Exception as e:
         return f"Error getting disk usage: {str(e)}"
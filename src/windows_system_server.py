@@ -1,10 +1,15 @@
 import os
+import re
 import subprocess
 import sys
 import json
 import shutil
+import ctypes
+import locale
+import platform
+import shlex
 import winreg
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 import asyncio
 import psutil
@@ -15,16 +20,99 @@ from mcp.server.fastmcp import FastMCP
 mcp = FastMCP("windows-system-control")
 
 # Security whitelist for safe commands
+# (frozensets, so membership checks are hash lookups)
 SAFE_COMMANDS = {
-    'file_operations': ['dir', 'type', 'copy', 'move', 'del', 'mkdir', 'rmdir'],
-    'system_info': ['systeminfo', 'tasklist', 'ipconfig', 'ping', 'netstat'],
-    'process_control': ['tasklist', 'taskkill'],
-    'network': ['ping', 'nslookup', 'ipconfig', 'netstat'],
-    'service_control': ['sc', 'net']
+    'file_operations': frozenset(['dir', 'type', 'copy', 'move', 'del', 'mkdir', 'rmdir']),
+    'system_info': frozenset(['systeminfo', 'tasklist', 'ipconfig', 'ping', 'netstat']),
+    'process_control': frozenset(['tasklist', 'taskkill']),
+    'network': frozenset(['ping', 'nslookup', 'ipconfig', 'netstat']),
+    'service_control': frozenset(['sc', 'net'])
 }
 
 # Dangerous commands that require explicit confirmation
-DANGEROUS_COMMANDS = ['format', 'fdisk', 'del', 'rmdir', 'shutdown', 'restart']
+DANGEROUS_COMMANDS = frozenset(['format', 'fdisk', 'del', 'rmdir', 'shutdown', 'restart'])
+# All of the above as whole words, checked in one regex pass
+DANGEROUS_COMMAND_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, sorted(DANGEROUS_COMMANDS))) + r')\b',
+    re.IGNORECASE
+)
+
+# Platform details don't change while the server runs, and
+# platform.processor() is slow on Windows, so read them once
+PLATFORM_INFO = {
+    'system': platform.system(),
+    'release': platform.release(),
+    'machine': platform.machine(),
+    'processor': platform.processor(),
+    'cpu_count': psutil.cpu_count(),
+}
+
+# Prime psutil so system_info's cpu_percent(interval=None) reports usage since
+# the previous call instead of sleeping on the event loop to measure it
+psutil.cpu_percent(interval=None)
+
+# Largest amount of text returned from a file read; anything longer is
+# cut off rather than loaded into memory whole
+MAX_READ_CHARS = 1 << 20
+
+# cmd.exe built-ins and operators only work when the command goes through
+# the shell; everything else is started directly without a cmd.exe process
+SHELL_BUILTINS = frozenset([
+    'assoc', 'call', 'cd', 'chdir', 'cls', 'copy', 'date', 'del', 'dir', 'echo',
+    'erase', 'ftype', 'md', 'mkdir', 'mklink', 'move', 'path', 'rd', 'ren',
+    'rename', 'rmdir', 'set', 'start', 'time', 'title', 'type', 'ver', 'vol'
+])
+SHELL_OPERATORS = ('|', '&', '<', '>', '^', '%')
+
+async def _communicate(proc, timeout: Optional[float]) -> Tuple[int, str, str]:
+    """Wait for a subprocess, returning (returncode, stdout, stderr).
+    
+    On timeout the process is killed and asyncio.TimeoutError is raised.
+    """
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    
+    # Same decoding subprocess.run(text=True) used
+    encoding = locale.getpreferredencoding(False)
+    return (proc.returncode,
+            stdout.decode(encoding, errors='replace'),
+            stderr.decode(encoding, errors='replace'))
+
+async def _run(args: List[str], timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run a program directly without blocking the event loop."""
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    return await _communicate(proc, timeout)
+
+async def _run_shell(command: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run a command line through the shell without blocking the event loop."""
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    return await _communicate(proc, timeout)
+
+async def _run_command(command: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run a user-supplied command line, only involving cmd.exe when it needs the shell."""
+    args = [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg
+            for arg in shlex.split(command, posix=False)]
+    if not args or args[0].lower() in SHELL_BUILTINS or any(op in command for op in SHELL_OPERATORS):
+        return await _run_shell(command, timeout)
+    # CreateProcess only searches PATH for .exe and can't start .cmd/.bat
+    # shims such as npm or code, so those (and anything unresolved) go
+    # through cmd.exe like before
+    program = shutil.which(args[0])
+    if program is None or program.lower().endswith(('.cmd', '.bat')):
+        return await _run_shell(command, timeout)
+    return await _run([program] + args[1:], timeout)
 
 @mcp.tool()
 async def execute_command(command: str, confirm_dangerous: bool = False) -> str:
@@ -36,31 +124,100 @@ async def execute_command(command: str, confirm_dangerous: bool = False) -> str:
     """
     try:
         # Check for dangerous commands
-        cmd_lower = command.lower()
-        if any(dangerous in cmd_lower for dangerous in DANGEROUS_COMMANDS):
+        if DANGEROUS_COMMAND_RE.search(command):
             if not confirm_dangerous:
                 return f"⚠️ DANGEROUS COMMAND DETECTED: '{command}'\nThis command could be harmful. If you're sure you want to execute it, call this tool again with confirm_dangerous=True"
         
         # Execute the command
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        _, stdout, stderr = await _run_command(command, timeout=30)
         
-        output = result.stdout
-        if result.stderr:
-            output += f"\nErrors: {result.stderr}"
+        output = stdout
+        if stderr:
+            output += f"\nErrors: {stderr}"
             
         return f"✅ Command executed successfully:\n{output}"
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return "❌ Command timed out after 30 seconds"
     except Exception as e:
         return f"❌ Error executing command: {str(e)}"
 
+# File handlers run their blocking I/O on worker threads via asyncio.to_thread
+# so a slow disk or network share doesn't stall other tool calls
+
+def _copy_file(source: str, destination: str) -> None:
+    """Copy a file with its metadata, letting Windows do the copy when it can.
+    
+    CopyFileExW copies inside the kernel (and can clone extents on ReFS)
+    instead of pushing the data through a Python buffer loop.
+    """
+    if os.path.isdir(destination):
+        destination = os.path.join(destination, os.path.basename(source))
+    if os.name == 'nt' and ctypes.windll.kernel32.CopyFileExW(source, destination, None, None, None, 0):
+        shutil.copystat(source, destination)
+        return
+    shutil.copy2(source, destination)
+
+def _read_text(path) -> Tuple[str, bool]:
+    """Read up to MAX_READ_CHARS of a UTF-8 file, returning (text, truncated)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read(MAX_READ_CHARS)
+        truncated = f.read(1) != ''
+    return content, truncated
+
+async def _file_read(source: str, destination: str) -> str:
+    source_path = Path(source)
+    if source_path.exists() and source_path.is_file():
+        content, truncated = await asyncio.to_thread(_read_text, source_path)
+        if truncated:
+            content += f"\n...[truncated after {MAX_READ_CHARS} characters]"
+        return f"📄 File content:\n{content}"
+    else:
+        return f"❌ File not found: {source}"
+
+async def _file_write(source: str, destination: str) -> str:
+    if not destination:
+        return "❌ Destination content required for write operation"
+    await asyncio.to_thread(Path(source).write_text, destination, encoding='utf-8')
+    return f"✅ File written successfully: {source}"
+
+async def _file_copy(source: str, destination: str) -> str:
+    if not destination:
+        return "❌ Destination required for copy operation"
+    await asyncio.to_thread(_copy_file, source, destination)
+    return f"✅ File copied from {source} to {destination}"
+
+async def _file_move(source: str, destination: str) -> str:
+    if not destination:
+        return "❌ Destination required for move operation"
+    await asyncio.to_thread(shutil.move, source, destination)
+    return f"✅ File moved from {source} to {destination}"
+
+async def _file_delete(source: str, destination: str) -> str:
+    source_path = Path(source)
+    if source_path.is_file():
+        await asyncio.to_thread(source_path.unlink)
+        return f"✅ File deleted: {source}"
+    elif source_path.is_dir():
+        await asyncio.to_thread(shutil.rmtree, source)
+        return f"✅ Directory deleted: {source}"
+    else:
+        return f"❌ Path not found: {source}"
+
+async def _file_create_dir(source: str, destination: str) -> str:
+    Path(source).mkdir(parents=True, exist_ok=True)
+    return f"✅ Directory created: {source}"
+
+# file_operations action -> handler(source, destination)
+FILE_HANDLERS = {
+    'read': _file_read,
+    'write': _file_write,
+    'copy': _file_copy,
+    'move': _file_move,
+    'delete': _file_delete,
+    'create_dir': _file_create_dir,
+}
+
 @mcp.tool()
 async def file_operations(action: str, source: str, destination: str = None) -> str:
     """Perform file operations like copy, move, delete, create directory.
@@ -70,53 +227,11 @@ async def file_operations(action: str, source: str, destination: str = None) ->
         source: Source file or directory path
         destination: Destination path (required for copy/move)
     """
+    handler = FILE_HANDLERS.get(action)
+    if handler is None:
+        return f"❌ Unknown action: {action}"
     try:
-        source_path = Path(source)
-        
-        if action == "read":
-            if source_path.exists() and source_path.is_file():
-                with open(source_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                return f"📄 File content:\n{content}"
-            else:
-                return f"❌ File not found: {source}"
-                
-        elif action == "write":
-            if not destination:
-                return "❌ Destination content required for write operation"
-            with open(source_path, 'w', encoding='utf-8') as f:
-                f.write(destination)
-            return f"✅ File written successfully: {source}"
-            
-        elif action == "copy":
-            if not destination:
-                return "❌ Destination required for copy operation"
-            shutil.copy2(source, destination)
-            return f"✅ File copied from {source} to {destination}"
-            
-        elif action == "move":
-            if not destination:
-                return "❌ Destination required for move operation"
-            shutil.move(source, destination)
-            return f"✅ File moved from {source} to {destination}"
-            
-        elif action == "delete":
-            if source_path.is_file():
-                source_path.unlink()
-                return f"✅ File deleted: {source}"
-            elif source_path.is_dir():
-                shutil.rmtree(source)
-                return f"✅ Directory deleted: {source}"
-            else:
-                return f"❌ Path not found: {source}"
-                
-        elif action == "create_dir":
-            source_path.mkdir(parents=True, exist_ok=True)
-            return f"✅ Directory created: {source}"
-            
-        else:
-            return f"❌ Unknown action: {action}"
-            
+        return await handler(source, destination)
     except Exception as e:
         return f"❌ Error performing file operation: {str(e)}"
 
@@ -125,11 +240,10 @@ async def system_info() -> str:
     """Get comprehensive system information."""
     try:
         # Basic system info
-        import platform
         info = []
-        info.append(f"🖥️ System: {platform.system()} {platform.release()}")
-        info.append(f"💻 Machine: {platform.machine()}")
-        info.append(f"🔧 Processor: {platform.processor()}")
+        info.append(f"🖥️ System: {PLATFORM_INFO['system']} {PLATFORM_INFO['release']}")
+        info.append(f"💻 Machine: {PLATFORM_INFO['machine']}")
+        info.append(f"🔧 Processor: {PLATFORM_INFO['processor']}")
         
         # Memory info
         memory = psutil.virtual_memory()
@@ -144,14 +258,80 @@ async def system_info() -> str:
         info.append(f"📈 Disk Usage: {(disk.used / disk.total) * 100:.1f}%")
         
         # CPU info
-        info.append(f"🔥 CPU Usage: {psutil.cpu_percent(interval=1)}%")
-        info.append(f"⚙️ CPU Cores: {psutil.cpu_count()}")
+        info.append(f"🔥 CPU Usage: {psutil.cpu_percent(interval=None)}%")
+        info.append(f"⚙️ CPU Cores: {PLATFORM_INFO['cpu_count']}")
         
         return "\n".join(info)
         
     except Exception as e:
         return f"❌ Error getting system info: {str(e)}"
 
+# One line of process_management(list) output, filled from proc.info
+PROCESS_LINE = "PID: {pid}, Name: {name}, CPU: {cpu_percent:.1f}%, Memory: {memory_percent:.1f}%"
+
+def _matching_processes(process_name: str = None, pid: int = None):
+    """Yield processes with the given PID or name, looking the PID up directly."""
+    if pid:
+        try:
+            yield psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            pass
+    if process_name:
+        # Only names are fetched while scanning; callers query the match
+        target = process_name.lower()
+        for proc in psutil.process_iter(['name']):
+            if proc.info['name'] and proc.info['name'].lower() == target:
+                yield proc
+
+async def _process_list(process_name: str, pid: int) -> str:
+    # process_iter fetches the requested attrs inside one oneshot()
+    # block per process; only 20 are shown, so stop querying there
+    processes = []
+    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        try:
+            processes.append(PROCESS_LINE.format_map(proc.info))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        if len(processes) == 20:
+            break
+    
+    # Show top 20 processes
+    return "🔍 Running Processes (Top 20):\n" + "\n".join(processes)
+
+async def _process_kill(process_name: str, pid: int) -> str:
+    if not process_name and not pid:
+        return "❌ Process name or PID required for kill action"
+    
+    for proc in _matching_processes(process_name, pid):
+        try:
+            name = proc.name()
+            proc.kill()
+            return f"✅ Process killed: {name} (PID: {proc.pid})"
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    
+    return f"❌ Process not found: {process_name or pid}"
+
+async def _process_info(process_name: str, pid: int) -> str:
+    if not process_name and not pid:
+        return "❌ Process name or PID required for info action"
+    
+    for proc in _matching_processes(process_name, pid):
+        try:
+            with proc.oneshot():
+                return f"📊 Process Info:\nPID: {proc.pid}\nName: {proc.name()}\nStatus: {proc.status()}\nCPU: {proc.cpu_percent():.1f}%\nMemory: {proc.memory_percent():.1f}%"
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    
+    return f"❌ Process not found: {process_name or pid}"
+
+# process_management action -> handler(process_name, pid)
+PROCESS_HANDLERS = {
+    'list': _process_list,
+    'kill': _process_kill,
+    'info': _process_info,
+}
+
 @mcp.tool()
 async def process_management(action: str, process_name: str = None, pid: int = None) -> str:
     """Manage system processes.
@@ -161,56 +341,42 @@ async def process_management(action: str, process_name: str = None, pid: int = N
         process_name: Name of the process (for kill/info actions)
         pid: Process ID (alternative to process_name)
     """
+    handler = PROCESS_HANDLERS.get(action)
+    if handler is None:
+        return f"❌ Unknown action: {action}"
     try:
-        if action == "list":
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    processes.append(f"PID: {proc.info['pid']}, Name: {proc.info['name']}, CPU: {proc.info['cpu_percent']:.1f}%, Memory: {proc.info['memory_percent']:.1f}%")
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            # Show top 20 processes
-            return "🔍 Running Processes (Top 20):\n" + "\n".join(processes[:20])
-            
-        elif action == "kill":
-            if not process_name and not pid:
-                return "❌ Process name or PID required for kill action"
-                
-            killed = False
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    if (process_name and proc.info['name'].lower() == process_name.lower()) or \
-                       (pid and proc.info['pid'] == pid):
-                        proc.kill()
-                        killed = True
-                        return f"✅ Process killed: {proc.info['name']} (PID: {proc.info['pid']})"
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-                    
-            if not killed:
-                return f"❌ Process not found: {process_name or pid}"
-                
-        elif action == "info":
-            if not process_name and not pid:
-                return "❌ Process name or PID required for info action"
-                
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status']):
-                try:
-                    if (process_name and proc.info['name'].lower() == process_name.lower()) or \
-                       (pid and proc.info['pid'] == pid):
-                        return f"📊 Process Info:\nPID: {proc.info['pid']}\nName: {proc.info['name']}\nStatus: {proc.info['status']}\nCPU: {proc.info['cpu_percent']:.1f}%\nMemory: {proc.info['memory_percent']:.1f}%"
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-                    
-            return f"❌ Process not found: {process_name or pid}"
-            
-        else:
-            return f"❌ Unknown action: {action}"
-            
+        return await handler(process_name, pid)
     except Exception as e:
         return f"❌ Error managing process: {str(e)}"
 
+async def _network_ping(target: str) -> str:
+    if not target:
+        return "❌ Target required for ping operation"
+    _, stdout, _ = await _run(["ping", "-n", "4", target])
+    return f"🌐 Ping Results:\n{stdout}"
+
+async def _network_ipconfig(target: str) -> str:
+    _, stdout, _ = await _run(["ipconfig", "/all"])
+    return f"🔧 IP Configuration:\n{stdout}"
+
+async def _network_netstat(target: str) -> str:
+    _, stdout, _ = await _run(["netstat", "-an"])
+    return f"📡 Network Connections:\n{stdout[:2000]}..."  # Truncate for readability
+
+async def _network_nslookup(target: str) -> str:
+    if not target:
+        return "❌ Target required for nslookup operation"
+    _, stdout, _ = await _run(["nslookup", target])
+    return f"🔍 DNS Lookup Results:\n{stdout}"
+
+# network_operations action -> handler(target)
+NETWORK_HANDLERS = {
+    'ping': _network_ping,
+    'ipconfig': _network_ipconfig,
+    'netstat': _network_netstat,
+    'nslookup': _network_nslookup,
+}
+
 @mcp.tool()
 async def network_operations(action: str, target: str = None) -> str:
     """Perform network operations.
@@ -219,33 +385,52 @@ async def network_operations(action: str, target: str = None) -> str:
         action: Operation to perform (ping, ipconfig, netstat, nslookup)
         target: Target for operations like ping or nslookup
     """
+    handler = NETWORK_HANDLERS.get(action)
+    if handler is None:
+        return f"❌ Unknown network action: {action}"
     try:
-        if action == "ping":
-            if not target:
-                return "❌ Target required for ping operation"
-            result = subprocess.run(f"ping -n 4 {target}", shell=True, capture_output=True, text=True)
-            return f"🌐 Ping Results:\n{result.stdout}"
-            
-        elif action == "ipconfig":
-            result = subprocess.run("ipconfig /all", shell=True, capture_output=True, text=True)
-            return f"🔧 IP Configuration:\n{result.stdout}"
-            
-        elif action == "netstat":
-            result = subprocess.run("netstat -an", shell=True, capture_output=True, text=True)
-            return f"📡 Network Connections:\n{result.stdout[:2000]}..."  # Truncate for readability
-            
-        elif action == "nslookup":
-            if not target:
-                return "❌ Target required for nslookup operation"
-            result = subprocess.run(f"nslookup {target}", shell=True, capture_output=True, text=True)
-            return f"🔍 DNS Lookup Results:\n{result.stdout}"
-            
-        else:
-            return f"❌ Unknown network action: {action}"
-            
+        return await handler(target)
     except Exception as e:
         return f"❌ Error performing network operation: {str(e)}"
 
+async def _app_start(app_name: str, app_path: str) -> str:
+    if not app_name and not app_path:
+        return "❌ Application name or path required"
+    
+    if app_path:
+        subprocess.Popen(app_path)
+        return f"✅ Application started: {app_path}"
+    else:
+        subprocess.Popen(app_name, shell=True)
+        return f"✅ Application started: {app_name}"
+
+async def _app_stop(app_name: str, app_path: str) -> str:
+    if not app_name:
+        return "❌ Application name required for stop action"
+    
+    returncode, _, stderr = await _run(["taskkill", "/f", "/im", app_name])
+    if returncode == 0:
+        return f"✅ Application stopped: {app_name}"
+    else:
+        return f"❌ Failed to stop application: {app_name}\n{stderr}"
+
+async def _app_find(app_name: str, app_path: str) -> str:
+    if not app_name:
+        return "❌ Application name required for find action"
+    
+    returncode, stdout, _ = await _run(["where", app_name])
+    if returncode == 0:
+        return f"📍 Application found at: {stdout.strip()}"
+    else:
+        return f"❌ Application not found: {app_name}"
+
+# application_control action -> handler(app_name, app_path)
+APP_HANDLERS = {
+    'start': _app_start,
+    'stop': _app_stop,
+    'find': _app_find,
+}
+
 @mcp.tool()
 async def application_control(action: str, app_name: str = None, app_path: str = None) -> str:
     """Control applications (start, stop, find).
@@ -255,44 +440,55 @@ async def application_control(action: str, app_name: str = None, app_path: str =
         app_name: Name of the application
         app_path: Full path to the application executable
     """
+    handler = APP_HANDLERS.get(action)
+    if handler is None:
+        return f"❌ Unknown action: {action}"
     try:
-        if action == "start":
-            if not app_name and not app_path:
-                return "❌ Application name or path required"
-                
-            if app_path:
-                subprocess.Popen(app_path)
-                return f"✅ Application started: {app_path}"
-            else:
-                subprocess.Popen(app_name, shell=True)
-                return f"✅ Application started: {app_name}"
-                
-        elif action == "stop":
-            if not app_name:
-                return "❌ Application name required for stop action"
-                
-            result = subprocess.run(f"taskkill /f /im {app_name}", shell=True, capture_output=True, text=True)
-            if result.returncode == 0:
-                return f"✅ Application stopped: {app_name}"
-            else:
-                return f"❌ Failed to stop application: {app_name}\n{result.stderr}"
-                
-        elif action == "find":
-            if not app_name:
-                return "❌ Application name required for find action"
-                
-            result = subprocess.run(f"where {app_name}", shell=True, capture_output=True, text=True)
-            if result.returncode == 0:
-                return f"📍 Application found at: {result.stdout.strip()}"
-            else:
-                return f"❌ Application not found: {app_name}"
-                
-        else:
-            return f"❌ Unknown action: {action}"
-            
+        return await handler(app_name, app_path)
     except Exception as e:
         return f"❌ Error controlling application: {str(e)}"
 
+# Map root key names to constants
+REGISTRY_ROOT_KEYS = {
+    'HKEY_LOCAL_MACHINE': winreg.HKEY_LOCAL_MACHINE,
+    'HKEY_CURRENT_USER': winreg.HKEY_CURRENT_USER,
+    'HKEY_CLASSES_ROOT': winreg.HKEY_CLASSES_ROOT,
+    'HKEY_USERS': winreg.HKEY_USERS,
+    'HKEY_CURRENT_CONFIG': winreg.HKEY_CURRENT_CONFIG,
+}
+
+async def _registry_read(root_key, sub_key_path: str, key_path: str, value_name: str) -> str:
+    if not value_name:
+        return "❌ Value name required for read operation"
+    
+    with winreg.OpenKey(root_key, sub_key_path, 0, winreg.KEY_READ) as key:
+        value, reg_type = winreg.QueryValueEx(key, value_name)
+        return f"📖 Registry Value:\nPath: {key_path}\nValue: {value_name}\nData: {value}\nType: {reg_type}"
+
+async def _registry_list_keys(root_key, sub_key_path: str, key_path: str, value_name: str) -> str:
+    with winreg.OpenKey(root_key, sub_key_path, 0, winreg.KEY_READ) as key:
+        # QueryInfoKey gives the count up front, so only the subkeys
+        # that are shown get enumerated
+        subkey_count = winreg.QueryInfoKey(key)[0]
+        keys = [winreg.EnumKey(key, i) for i in range(min(subkey_count, 50))]  # Limit output
+    return f"📂 Registry Subkeys in {key_path}:\n" + "\n".join(keys)
+
+async def _registry_list_values(root_key, sub_key_path: str, key_path: str, value_name: str) -> str:
+    values = []
+    with winreg.OpenKey(root_key, sub_key_path, 0, winreg.KEY_READ) as key:
+        value_count = winreg.QueryInfoKey(key)[1]
+        for i in range(min(value_count, 50)):  # Limit output
+            name, data, reg_type = winreg.EnumValue(key, i)
+            values.append(f"{name}: {data} (Type: {reg_type})")
+    return f"📋 Registry Values in {key_path}:\n" + "\n".join(values)
+
+# registry_operations action -> handler(root_key, sub_key_path, key_path, value_name)
+REGISTRY_HANDLERS = {
+    'read': _registry_read,
+    'list_keys': _registry_list_keys,
+    'list_values': _registry_list_values,
+}
+
 @mcp.tool()
 async def registry_operations(action: str, key_path: str, value_name: str = None, value_data: str = None) -> str:
     """Perform Windows registry operations (read only for safety).
@@ -308,64 +504,53 @@ async def registry_operations(action: str, key_path: str, value_name: str = None
         key_parts = key_path.split('\\', 1)
         if len(key_parts) != 2:
             return "❌ Invalid key path format"
-            
+        
         root_key_name = key_parts[0]
         sub_key_path = key_parts[1]
         
-        # Map root key names to constants
-        root_keys = {
-            'HKEY_LOCAL_MACHINE': winreg.HKEY_LOCAL_MACHINE,
-            'HKEY_CURRENT_USER': winreg.HKEY_CURRENT_USER,
-            'HKEY_CLASSES_ROOT': winreg.HKEY_CLASSES_ROOT,
-            'HKEY_USERS': winreg.HKEY_USERS,
-            'HKEY_CURRENT_CONFIG': winreg.HKEY_CURRENT_CONFIG,
-        }
-        
-        if root_key_name not in root_keys:
+        if root_key_name not in REGISTRY_ROOT_KEYS:
             return f"❌ Invalid root key: {root_key_name}"
-            
-        root_key = root_keys[root_key_name]
         
-        if action == "read":
-            if not value_name:
-                return "❌ Value name required for read operation"
-                
-            with winreg.OpenKey(root_key, sub_key_path, 0, winreg.KEY_READ) as key:
-                value, reg_type = winreg.QueryValueEx(key, value_name)
-                return f"📖 Registry Value:\nPath: {key_path}\nValue: {value_name}\nData: {value}\nType: {reg_type}"
-                
-        elif action == "list_keys":
-            keys = []
-            with winreg.OpenKey(root_key, sub_key_path, 0, winreg.KEY_READ) as key:
-                i = 0
-                while True:
-                    try:
-                        subkey_name = winreg.EnumKey(key, i)
-                        keys.append(subkey_name)
-                        i += 1
-                    except OSError:
-                        break
-            return f"📂 Registry Subkeys in {key_path}:\n" + "\n".join(keys[:50])  # Limit output
-            
-        elif action == "list_values":
-            values = []
-            with winreg.OpenKey(root_key, sub_key_path, 0, winreg.KEY_READ) as key:
-                i = 0
-                while True:
-                    try:
-                        value_name, value_data, reg_type = winreg.EnumValue(key, i)
-                        values.append(f"{value_name}: {value_data} (Type: {reg_type})")
-                        i += 1
-                    except OSError:
-                        break
-            return f"📋 Registry Values in {key_path}:\n" + "\n".join(values[:50])  # Limit output
-            
-        else:
+        handler = REGISTRY_HANDLERS.get(action)
+        if handler is None:
             return f"❌ Unknown registry action: {action}"
-            
+        return await handler(REGISTRY_ROOT_KEYS[root_key_name], sub_key_path, key_path, value_name)
+    
     except Exception as e:
         return f"❌ Error performing registry operation: {str(e)}"
 
+async def _system_shutdown(delay: int) -> str:
+    if delay > 0:
+        await _run(["shutdown", "/s", "/t", str(delay)])
+        return f"⏰ System will shutdown in {delay} seconds"
+    else:
+        await _run(["shutdown", "/s", "/t", "0"])
+        return "🔌 System is shutting down now"
+
+async def _system_restart(delay: int) -> str:
+    if delay > 0:
+        await _run(["shutdown", "/r", "/t", str(delay)])
+        return f"⏰ System will restart in {delay} seconds"
+    else:
+        await _run(["shutdown", "/r", "/t", "0"])
+        return "🔄 System is restarting now"
+
+async def _system_sleep(delay: int) -> str:
+    await _run(["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"])
+    return "😴 System is going to sleep"
+
+async def _system_cancel(delay: int) -> str:
+    await _run(["shutdown", "/a"])
+    return "❌ Shutdown/restart cancelled"
+
+# system_control action -> handler(delay)
+SYSTEM_HANDLERS = {
+    'shutdown': _system_shutdown,
+    'restart': _system_restart,
+    'sleep': _system_sleep,
+    'cancel': _system_cancel,
+}
+
 @mcp.tool()
 async def system_control(action: str, delay: int = 0) -> str:
     """Control system power states (shutdown, restart, sleep).
@@ -374,34 +559,11 @@ async def system_control(action: str, delay: int = 0) -> str:
         action: Action to perform (shutdown, restart, sleep, cancel)
         delay: Delay in seconds before action (default: 0)
     """
+    handler = SYSTEM_HANDLERS.get(action)
+    if handler is None:
+        return f"❌ Unknown system control action: {action}"
     try:
-        if action == "shutdown":
-            if delay > 0:
-                subprocess.run(f"shutdown /s /t {delay}", shell=True)
-                return f"⏰ System will shutdown in {delay} seconds"
-            else:
-                subprocess.run("shutdown /s /t 0", shell=True)
-                return "🔌 System is shutting down now"
-                
-        elif action == "restart":
-            if delay > 0:
-                subprocess.run(f"shutdown /r /t {delay}", shell=True)
-                return f"⏰ System will restart in {delay} seconds"
-            else:
-                subprocess.run("shutdown /r /t 0", shell=True)
-                return "🔄 System is restarting now"
-                
-        elif action == "sleep":
-            subprocess.run("rundll32.exe powrprof.dll,SetSuspendState 0,1,0", shell=True)
-            return "😴 System is going to sleep"
-            
-        elif action == "cancel":
-            subprocess.run("shutdown /a", shell=True)
-            return "❌ Shutdown/restart cancelled"
-            
-        else:
-            return f"❌ Unknown system control action: {action}"
-            
+        return await handler(delay)
     except Exception as e:
         return f"❌ Error controlling system: {str(e)}"
 
@@ -37,9 +37,8 @@ def test_ml_engine():
             ("open_app", "calculator", 1.1),
         ]
         
-        for action_type, app, duration in sample_actions:
-            data_collector.record_action(action_type, app, duration)
-            print(f"   ✅ Recorded: {action_type} in {app} ({duration}s)")
+        data_collector.record_actions(sample_actions)
+        print(f"   ✅ Recorded {len(sample_actions)} actions")
         
         # Record system metrics
         data_collector.record_system_metrics()
@@ -77,11 +76,11 @@ def test_ml_engine():
         if len(data_collector.metrics) >= 10:
             print("\n⚙️  Testing system optimization...")
             
-            # Add more metrics for training
+            # Add more metrics for training. Sample psutil directly: the
+            # background poller only refreshes once per interval, so reading
+            # it back to back would store the same row 15 times.
             for i in range(15):
-                data_collector.record_system_metrics()
-                import time
-                time.sleep(0.1)
+                data_collector.record_system_metrics(fresh=True)
             
             training_result = system_optimizer.train_model(min_samples=10)
             if 'error' not in training_result:
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Shared pytest setup for MCP Windows Automation tests
+"""
+
+import asyncio
+import pathlib
+import sys
+
+# Make the repository root (unified_server.py, src/) importable from every test
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Optional: libuv-based event loop for the async tests on POSIX; Windows keeps
+# the default ProactorEventLoop
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
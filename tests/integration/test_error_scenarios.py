@@ -5,34 +5,31 @@ Error Scenario Tests
 
 import pytest
 import asyncio
-import sys
-import os
-
-# Add the src directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from unittest.mock import patch, MagicMock
 
 from unified_server import set_user_preference, get_system_info, run_command
 
 class TestErrorScenarios:
     """Test error handling scenarios"""
     
-    @pytest.mark.asyncio
     async def test_network_failures(self):
         """Test network failure handling"""
         # Test graceful handling of network failures
         result = await get_system_info()
         assert "Error" not in result
         
-    @pytest.mark.asyncio
     async def test_invalid_input_handling(self):
         """Test invalid input handling"""
         # Test malformed input handling
         result = await set_user_preference("", "", "")
         assert "Preference set" in result
         
-    @pytest.mark.asyncio
     async def test_command_execution_errors(self):
         """Test command execution error handling"""
-        # Test invalid command handling
-        result = await run_command("invalid_command_xyz")
+        # Test invalid command handling; only the wrapper's error path is under
+        # test, so the shell's "not recognized" response is simulated
+        not_found = MagicMock(returncode=1, stdout="",
+                              stderr="'invalid_command_xyz' is not recognized as an internal or external command")
+        with patch("unified_server.subprocess.run", return_value=not_found):
+            result = await run_command("invalid_command_xyz")
         assert "Error" in result or len(result) >= 0  # Should handle gracefully
@@ -4,17 +4,15 @@ Authentication Flow Tests for MCP Windows Security Tools
 """
 
 import pytest
+import asyncio
+import copy
 import json
-import tempfile
 import os
 from pathlib import Path
 from unittest.mock import patch, MagicMock
-import sys
-
-# Add the current directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 # Import the functions we need to test
+import unified_server
 from unified_server import (
     set_user_preference, 
     get_user_preference, 
@@ -24,32 +22,67 @@ from unified_server import (
     PREFERENCES_FILE
 )
 
+# Value types round-tripped by test_preference_data_validation
+PREFERENCE_TEST_CASES = [
+    ("category", "key", "string_value"),
+    ("category", "key", "123"),
+    ("category", "key", "true"),
+    ("category", "key", "false"),
+    ("category", "key", "null"),
+]
+
+@pytest.fixture(scope="class")
+def shared_preferences_dir(request, tmp_path_factory):
+    """One temporary directory per test class, cleaned up by pytest"""
+    request.cls.temp_dir = tmp_path_factory.mktemp("preferences")
+    # Use temporary file for testing
+    request.cls.test_preferences_file = str(request.cls.temp_dir / 'test_preferences.json')
+
+@pytest.mark.usefixtures("shared_preferences_dir")
 class TestAuthentication:
     """Test authentication flows for user preferences"""
     
-    def setup_method(self):
-        """Setup test environment before each test"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.original_preferences_file = PREFERENCES_FILE
-        # Use temporary file for testing
-        self.test_preferences_file = os.path.join(self.temp_dir, 'test_preferences.json')
-        
-        # Mock the global PREFERENCES_FILE
-        import unified_server
-        unified_server.PREFERENCES_FILE = self.test_preferences_file
-        
-    def teardown_method(self):
-        """Cleanup after each test"""
-        # Restore original preferences file
-        import unified_server
-        unified_server.PREFERENCES_FILE = self.original_preferences_file
-        
-        # Clean up temporary files
-        if os.path.exists(self.test_preferences_file):
-            os.remove(self.test_preferences_file)
-        os.rmdir(self.temp_dir)
+    # Tests that read or write the preferences file itself; every other test
+    # runs against an in-memory store patched over load/save_user_preferences
+    DISK_BACKED_TESTS = frozenset({
+        "test_preference_encryption",
+        "test_preference_backup_restore",
+        "test_malformed_preference_data",
+        "test_load_user_preferences_file_not_exists",
+        "test_save_user_preferences_error_handling",
+    })
+    
+    @pytest.fixture(autouse=True)
+    def _preferences(self, request, monkeypatch):
+        """Point the preference store at the temp file or the in-memory dict"""
+        if request.function.__name__ in self.DISK_BACKED_TESTS:
+            monkeypatch.setattr(unified_server, "PREFERENCES_FILE", self.test_preferences_file)
+            yield
+            # Write out deferred changes before the file is removed
+            unified_server.flush_user_preferences()
+            # Clean up the preferences file; the directory is shared by the class
+            try:
+                os.remove(self.test_preferences_file)
+            except FileNotFoundError:
+                pass
+        else:
+            self._store = {}
+            monkeypatch.setattr(unified_server, "load_user_preferences", self._load_store)
+            monkeypatch.setattr(unified_server, "save_user_preferences", self._save_store)
+            monkeypatch.setattr(unified_server, "_save_user_preferences_later", self._save_store)
+            yield
+    
+    def _load_store(self):
+        # Copies, like a fresh json.load, so callers can't mutate the store
+        return copy.deepcopy(self._store)
+    
+    def _save_store(self, preferences):
+        self._store = copy.deepcopy(preferences)
+    
+    def _seed_preferences(self, tree):
+        """Write a whole {category: {key: value}} tree in one save"""
+        unified_server.save_user_preferences(tree)
     
-    @pytest.mark.asyncio
     async def test_valid_user_preference_set(self):
         """Test setting valid user preferences"""
         # Test data
@@ -64,12 +97,11 @@ class TestAuthentication:
         assert f"Preference set: {category}.{key} = {value}" in result
         
         # Verify persistence
-        preferences = load_user_preferences()
+        preferences = unified_server.load_user_preferences()
         assert category in preferences
         assert key in preferences[category]
         assert preferences[category][key] == value
     
-    @pytest.mark.asyncio
     async def test_invalid_user_preference_set(self):
         """Test setting invalid user preferences"""
         # Test empty category
@@ -84,7 +116,6 @@ class TestAuthentication:
         result = await set_user_preference("category", "key", "")
         assert "Preference set: category.key = " in result
     
-    @pytest.mark.asyncio
     async def test_preference_access_control(self):
         """Test preference access control and isolation"""
         # Set preferences for different categories
@@ -102,7 +133,6 @@ class TestAuthentication:
         invalid_pref = await get_user_preference("music", "default")
         assert "not found" in invalid_pref
     
-    @pytest.mark.asyncio
     async def test_session_timeout(self):
         """Test session management and timeout handling"""
         # This test simulates session behavior
@@ -116,44 +146,45 @@ class TestAuthentication:
         assert "session.test_key = test_value" in result
         
         # Simulate session cleanup (in real implementation, this would be automatic)
-        preferences = load_user_preferences()
+        preferences = unified_server.load_user_preferences()
         if "session" in preferences:
             del preferences["session"]
-        save_user_preferences(preferences)
+        unified_server.save_user_preferences(preferences)
         
         # Verify session data is cleared
         result = await get_user_preference("session", "test_key")
         assert "not found" in result
     
-    @pytest.mark.asyncio
     async def test_concurrent_user_sessions(self):
         """Test handling of concurrent user sessions"""
         # Simulate multiple users by using different preference categories
         users = ["user1", "user2", "user3"]
         
-        # Set preferences for different users
-        for user in users:
-            await set_user_preference(user, "preference", f"{user}_value")
+        # Seed all but the last user in one write, then set the last one
+        # through the tool so it has to merge with the existing sessions
+        self._seed_preferences({user: {"preference": f"{user}_value"} for user in users[:-1]})
+        await set_user_preference(users[-1], "preference", f"{users[-1]}_value")
+        
+        # Fetch every user's preference at once
+        results = await asyncio.gather(*(get_user_preference(user, "preference") for user in users))
         
         # Verify each user's preferences are isolated
-        for user in users:
-            result = await get_user_preference(user, "preference")
+        for user, result in zip(users, results):
             assert f"{user}.preference = {user}_value" in result
         
         # Verify no cross-user data leakage
-        for user in users:
+        for user, result in zip(users, results):
             for other_user in users:
                 if user != other_user:
-                    result = await get_user_preference(user, "preference")
                     assert f"{other_user}_value" not in result
     
-    @pytest.mark.asyncio
     async def test_preference_encryption(self):
         """Test preference data encryption/security"""
         # Set a sensitive preference
         await set_user_preference("security", "api_key", "secret_key_123")
         
         # Read the raw file to ensure it's not stored in plaintext
+        unified_server.flush_user_preferences()
         with open(self.test_preferences_file, 'r') as f:
             file_content = f.read()
         
@@ -167,7 +198,6 @@ class TestAuthentication:
         result = await get_user_preference("security", "api_key")
         assert "security.api_key = secret_key_123" in result
     
-    @pytest.mark.asyncio
     async def test_preference_backup_restore(self):
         """Test preference backup and restore functionality"""
         # Set initial preferences
@@ -176,34 +206,26 @@ class TestAuthentication:
             "browser": {"default": "chrome", "homepage": "google.com"}
         }
         
-        for category, prefs in test_preferences.items():
-            for key, value in prefs.items():
-                await set_user_preference(category, key, value)
+        self._seed_preferences(test_preferences)
         
         # Create backup
-        backup_file = os.path.join(self.temp_dir, 'backup_preferences.json')
         original_preferences = load_user_preferences()
-        with open(backup_file, 'w') as f:
-            json.dump(original_preferences, f)
+        backup_preferences = copy.deepcopy(original_preferences)
         
         # Modify preferences
         await set_user_preference("music", "favorite_song", "Song B")
         
         # Restore from backup
-        with open(backup_file, 'r') as f:
-            backup_preferences = json.load(f)
         save_user_preferences(backup_preferences)
         
         # Verify restoration
         result = await get_user_preference("music", "favorite_song")
         assert "music.favorite_song = Song A" in result
     
-    @pytest.mark.asyncio
     async def test_malformed_preference_data(self):
         """Test handling of malformed preference data"""
         # Create malformed JSON file
-        with open(self.test_preferences_file, 'w') as f:
-            f.write('{"invalid": json"}')
+        Path(self.test_preferences_file).write_bytes(b'{"invalid": json"}')
         
         # Should handle gracefully
         result = await get_user_preference("test", "key")
@@ -213,46 +235,38 @@ class TestAuthentication:
         result = await set_user_preference("test", "key", "value")
         assert "Preference set: test.key = value" in result
     
-    @pytest.mark.asyncio
-    async def test_preference_data_validation(self):
+    @pytest.mark.parametrize("category,key,value", PREFERENCE_TEST_CASES)
+    async def test_preference_data_validation(self, category, key, value):
         """Test input validation for preference data"""
-        # Test various input types
-        test_cases = [
-            ("category", "key", "string_value"),
-            ("category", "key", "123"),
-            ("category", "key", "true"),
-            ("category", "key", "false"),
-            ("category", "key", "null"),
-        ]
-        
-        for category, key, value in test_cases:
-            result = await set_user_preference(category, key, value)
-            assert f"Preference set: {category}.{key} = {value}" in result
-            
-            # Verify retrieval
-            retrieved = await get_user_preference(category, key)
-            assert f"{category}.{key} = {value}" in retrieved
+        expected = f"{category}.{key} = {value}"
+        
+        result = await set_user_preference(category, key, value)
+        assert "Preference set: " + expected in result
+        
+        # Verify retrieval
+        retrieved = await get_user_preference(category, key)
+        assert expected in retrieved
     
-    @pytest.mark.asyncio
     async def test_preference_list_functionality(self):
         """Test preference listing functionality"""
         # Set multiple preferences
-        await set_user_preference("music", "favorite_song", "Song A")
-        await set_user_preference("music", "volume", "80")
-        await set_user_preference("browser", "default", "chrome")
+        self._seed_preferences({
+            "music": {"favorite_song": "Song A", "volume": "80"},
+            "browser": {"default": "chrome"}
+        })
         
-        # List all preferences
-        result = await list_user_preferences()
+        # Verify the listed data
+        assert unified_server._list_user_preferences_dict() == {
+            "music": {"favorite_song": "Song A", "volume": "80"},
+            "browser": {"default": "chrome"}
+        }
         
-        # Verify structure
-        assert "User Preferences:" in result
-        assert "[music]" in result
-        assert "favorite_song: Song A" in result
-        assert "volume: 80" in result
-        assert "[browser]" in result
-        assert "default: chrome" in result
+        # Verify structure of the formatted listing line by line
+        result = await list_user_preferences()
+        lines = set(result.splitlines())
+        assert {"User Preferences:", "[music]", "  favorite_song: Song A", "  volume: 80",
+                "[browser]", "  default: chrome"} <= lines
     
-    @pytest.mark.asyncio
     async def test_empty_preference_list(self):
         """Test listing when no preferences exist"""
         result = await list_user_preferences()
@@ -261,31 +275,26 @@ class TestAuthentication:
     def test_load_user_preferences_file_not_exists(self):
         """Test loading preferences when file doesn't exist"""
         # Remove the file if it exists
-        if os.path.exists(self.test_preferences_file):
+        try:
             os.remove(self.test_preferences_file)
+        except FileNotFoundError:
+            pass
         
         preferences = load_user_preferences()
         assert preferences == {}
     
-    def test_save_user_preferences_error_handling(self):
+    def test_save_user_preferences_error_handling(self, monkeypatch, tmp_path):
         """Test error handling when saving preferences"""
-        # Create invalid directory path
-        invalid_path = "/invalid/path/preferences.json"
-        
-        import unified_server
-        original_file = unified_server.PREFERENCES_FILE
-        unified_server.PREFERENCES_FILE = invalid_path
+        # Path under directories that are guaranteed not to exist on any platform
+        invalid_path = tmp_path / "missing" / "path" / "preferences.json"
+        monkeypatch.setattr(unified_server, "PREFERENCES_FILE", str(invalid_path))
         
         try:
             # This should handle the error gracefully
             save_user_preferences({"test": "data"})
-            # If we reach here, the function handled the error gracefully
-            assert True
         except Exception as e:
             # Should not raise an exception
             assert False, f"save_user_preferences raised exception: {e}"
-        finally:
-            unified_server.PREFERENCES_FILE = original_file
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
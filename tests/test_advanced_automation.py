@@ -105,8 +105,8 @@ async def test_automation_features():
                 "parameters": {"app_name": "calculator"}
             },
             {
-                "action": "wait",
-                "parameters": {"seconds": 2}
+                "action": "wait_for_window",
+                "parameters": {"title": "Calculator", "timeout": 2.0}
             },
             {
                 "action": "type",
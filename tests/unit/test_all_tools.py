@@ -5,11 +5,6 @@ Tests for All 98 Security Tools
 
 import pytest
 import asyncio
-import sys
-import os
-
-# Add the src directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 # Import all tools from unified_server
 from unified_server import (
@@ -48,7 +43,6 @@ from unified_server import (
 class TestAllSecurityTools:
     """Test all 98 security tools"""
     
-    @pytest.mark.asyncio
     async def test_user_preference_tools(self):
         """Test user preference management tools"""
         # Test set_user_preference
@@ -63,7 +57,6 @@ class TestAllSecurityTools:
         result = await list_user_preferences()
         assert "test" in result
         
-    @pytest.mark.asyncio
     async def test_system_monitoring_tools(self):
         """Test system monitoring tools"""
         # Test get_system_info
@@ -82,7 +75,6 @@ class TestAllSecurityTools:
         result = await get_installed_programs()
         assert "Error" not in result
         
-    @pytest.mark.asyncio
     async def test_ui_automation_tools(self):
         """Test UI automation tools"""
         # Test get_mouse_position
@@ -93,7 +85,6 @@ class TestAllSecurityTools:
         result = await type_text("test")
         assert "Error" not in result
         
-    @pytest.mark.asyncio
     async def test_application_control_tools(self):
         """Test application control tools"""
         # Test open_app_with_url
@@ -104,7 +95,6 @@ class TestAllSecurityTools:
         result = await run_command("echo test")
         assert "Error" not in result
         
-    @pytest.mark.asyncio  
     async def test_media_tools(self):
         """Test media and entertainment tools"""
         # Test open_youtube_with_search
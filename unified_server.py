@@ -23,6 +23,7 @@ import winreg
 import urllib.parse
 import threading
 import logging
+from collections import Counter
 from datetime import datetime
 
 # Advanced UI Automation imports
@@ -514,6 +515,8 @@ With Advanced UI Automation and Application Interaction
 """
 
 import os
+import asyncio
+import atexit
 import subprocess
 import sys
 import platform
@@ -556,6 +559,13 @@ if UI_AUTOMATION_AVAILABLE:
     pyautogui.FAILSAFE = True  # Move mouse to top-left corner to abort
     pyautogui.PAUSE = 0.1  # Small pause between actions
 
+# Optional: faster JSON encode/decode for the preferences file
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Initialize FastMCP server
 mcp = FastMCP("unified-server")
 
@@ -566,34 +576,148 @@ PREFERENCES_FILE = "user_preferences.json"
 # USER PREFERENCES MANAGEMENT
 # ==============================================================================
 
+# How long set_user_preference waits for further changes before writing
+PREFERENCES_FLUSH_DELAY = 0.05
+
+# (path, mtime_ns, size) of the preferences file and the dict parsed from it
+_preferences_cache: Optional[Tuple[tuple, dict]] = None
+# (path, dict) changed by set_user_preference but not yet written, and the
+# timer that will write it
+_pending_preferences: Optional[Tuple[str, dict]] = None
+_preferences_flush_handle = None
+# Guards the pending write and its timer; tools can be called from worker
+# threads (e.g. the GUI's executor) as well as the server loop
+_preferences_lock = threading.RLock()
+
+def _preferences_stamp(path: str) -> tuple:
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size)
+
 def load_user_preferences() -> dict:
-    """Load user preferences from file"""
+    """Load user preferences from file
+    
+    The parsed dict is reused until the file's mtime or size changes, and
+    changes still waiting to be written are returned in place of the file.
+    The result is shared with later callers and must be treated as
+    read-only: to change preferences, copy the levels being modified and
+    pass the new dict to save_user_preferences.
+    """
+    global _preferences_cache
+    pending = _pending_preferences
+    if pending is not None and pending[0] == PREFERENCES_FILE:
+        return pending[1]
     try:
         if Path(PREFERENCES_FILE).exists():
-            with open(PREFERENCES_FILE, 'r') as f:
-                return json.load(f)
+            stamp = _preferences_stamp(PREFERENCES_FILE)
+            if _preferences_cache is not None and _preferences_cache[0] == stamp:
+                return _preferences_cache[1]
+            with open(PREFERENCES_FILE, 'rb') as f:
+                data = f.read()
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            preferences = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+            _preferences_cache = (stamp, preferences)
+            return preferences
         return {}
     except (IOError, json.JSONDecodeError) as e:
         print(f"Warning: Error loading preferences: {e}")
         return {}
 
+def _write_preferences(path: str, preferences: dict):
+    """Serialize preferences to a temporary file and swap it in over path
+    
+    The dict is cached as written, so callers must not modify it afterwards.
+    """
+    global _preferences_cache
+    data = None
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(preferences, option=orjson.OPT_INDENT_2)
+    # Other readers open this file in text mode with the locale encoding, so
+    # keep it ASCII: orjson writes raw UTF-8 where json escapes it
+    if data is None or not data.isascii():
+        data = json.dumps(preferences, indent=2).encode('ascii')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    _preferences_cache = (_preferences_stamp(path), preferences)
+
+def _drop_pending_preferences():
+    """Forget the deferred write; the caller holds _preferences_lock"""
+    global _pending_preferences, _preferences_flush_handle
+    # Timer handles may only be cancelled from the loop's own (main) thread.
+    # A timer left running elsewhere finds nothing pending and does nothing.
+    if _preferences_flush_handle is not None and threading.current_thread() is threading.main_thread():
+        _preferences_flush_handle.cancel()
+    _preferences_flush_handle = None
+    _pending_preferences = None
+
 def save_user_preferences(preferences: dict):
     """Save user preferences to file"""
-    try:
-        with open(PREFERENCES_FILE, 'w') as f:
-            json.dump(preferences, f, indent=2)
-    except Exception as e:
-        print(f"Error saving preferences: {e}")
+    global _preferences_cache
+    with _preferences_lock:
+        # This write supersedes any deferred one for the same file
+        if _pending_preferences is not None and _pending_preferences[0] == PREFERENCES_FILE:
+            _drop_pending_preferences()
+        try:
+            _write_preferences(PREFERENCES_FILE, preferences)
+        except Exception as e:
+            # Re-read the file on the next load rather than trust the cache
+            _preferences_cache = None
+            print(f"Error saving preferences: {e}")
+
+def flush_user_preferences():
+    """Write any deferred preference changes to disk now"""
+    global _preferences_cache
+    with _preferences_lock:
+        pending = _pending_preferences
+        _drop_pending_preferences()
+        if pending is not None:
+            path, preferences = pending
+            try:
+                _write_preferences(path, preferences)
+            except Exception as e:
+                _preferences_cache = None
+                print(f"Error saving preferences: {e}")
+
+atexit.register(flush_user_preferences)
+
+def _save_user_preferences_later(preferences: dict):
+    """Write preferences after PREFERENCES_FLUSH_DELAY unless changed again
+    
+    Each call restarts the timer, so a burst of set_user_preference calls
+    costs one write. Only the server's loop on the main thread lives long
+    enough for the timer to fire; other callers (no running loop, or a
+    short-lived loop in a worker thread such as the GUI's) save immediately.
+    """
+    global _pending_preferences, _preferences_flush_handle
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is None or threading.current_thread() is not threading.main_thread():
+        save_user_preferences(preferences)
+        return
+    with _preferences_lock:
+        if _pending_preferences is not None and _pending_preferences[0] != PREFERENCES_FILE:
+            # PREFERENCES_FILE was repointed; write the old file's changes first
+            flush_user_preferences()
+        if _preferences_flush_handle is not None:
+            _preferences_flush_handle.cancel()
+        _pending_preferences = (PREFERENCES_FILE, preferences)
+        _preferences_flush_handle = loop.call_later(PREFERENCES_FLUSH_DELAY, flush_user_preferences)
 
 @mcp.tool()
 async def set_user_preference(category: str, key: str, value: str) -> str:
     """Set a user preference (e.g., favorite song, default browser)"""
     try:
-        preferences = load_user_preferences()
-        if category not in preferences:
-            preferences[category] = {}
-        preferences[category][key] = value
-        save_user_preferences(preferences)
+        # Held across load and save so writers on other threads don't
+        # overwrite each other's changes
+        with _preferences_lock:
+            # Copy only the levels being changed; the loaded dict is shared
+            preferences = dict(load_user_preferences())
+            preferences[category] = dict(preferences.get(category, {}))
+            preferences[category][key] = value
+            _save_user_preferences_later(preferences)
         return f"Preference set: {category}.{key} = {value}"
     except Exception as e:
         return f"Error setting preference: {str(e)}"
@@ -610,11 +734,15 @@ async def get_user_preference(category: str, key: str) -> str:
     except Exception as e:
         return f"Error getting preference: {str(e)}"
 
+def _list_user_preferences_dict() -> dict:
+    """All user preferences as {category: {key: value}}"""
+    return {category: dict(items) for category, items in load_user_preferences().items()}
+
 @mcp.tool()
 async def list_user_preferences() -> str:
     """List all user preferences"""
     try:
-        preferences = load_user_preferences()
+        preferences = _list_user_preferences_dict()
         if not preferences:
             return "No user preferences set"
         result = []
@@ -699,12 +827,12 @@ async def add_to_playlist(song_name: str) -> str:
     """Add a song to user's playlist"""
     try:
         preferences = load_user_preferences()
-        if 'music' not in preferences:
-            preferences['music'] = {}
-        if 'playlist' not in preferences['music']:
-            preferences['music']['playlist'] = []
-        if song_name not in preferences['music']['playlist']:
-            preferences['music']['playlist'].append(song_name)
+        playlist = preferences.get('music', {}).get('playlist', [])
+        if song_name not in playlist:
+            # Copy the levels being changed; the loaded dict is shared
+            preferences = dict(preferences)
+            preferences['music'] = dict(preferences.get('music', {}))
+            preferences['music']['playlist'] = playlist + [song_name]
             save_user_preferences(preferences)
             return f"Added '{song_name}' to your playlist"
         else:
@@ -949,9 +1077,8 @@ try:
             
             # Try to load raw data to diagnose issue
             try:
-                import json
-                with open('ml_data.json', 'r') as f:
-                    raw_data = json.load(f)
+                from src.ml_predictive_engine import load_ml_data
+                raw_data = load_ml_data('ml_data.json')
                 raw_actions = len(raw_data.get('actions', []))
                 raw_metrics = len(raw_data.get('metrics', []))
                 print(f"Raw file contains {raw_actions} actions and {raw_metrics} metrics")
@@ -2439,9 +2566,8 @@ class ChromeAutomation:
             self.cookie_storage[domain] = cookies
             
             # Save to preferences file
-            preferences = load_user_preferences()
-            if 'cookies' not in preferences:
-                preferences['cookies'] = {}
+            preferences = dict(load_user_preferences())
+            preferences['cookies'] = dict(preferences.get('cookies', {}))
             preferences['cookies'][domain] = cookies
             save_user_preferences(preferences)
             
@@ -4887,38 +5013,28 @@ async def registry_read_key(hive: str, key_path: str, value_name: str = "") -> s
                 type_name = type_names.get(reg_type, f'Type {reg_type}')
                 return f"Registry Value: {hive}\\{key_path}\\{value_name}\nValue: {value}\nType: {type_name}"
             else:
-                # List all values in key
+                # List values in key. QueryInfoKey gives the totals up front,
+                # so only the entries that are shown get enumerated.
+                subkey_count, value_count, _ = winreg.QueryInfoKey(key)
+                
                 values = []
-                try:
-                    i = 0
-                    while True:
-                        name, value, reg_type = winreg.EnumValue(key, i)
-                        values.append(f"{name}: {value}")
-                        i += 1
-                except OSError:
-                    pass
+                for i in range(min(value_count, 20)):
+                    name, value, reg_type = winreg.EnumValue(key, i)
+                    values.append(f"{name}: {value}")
                 
-                subkeys = []
-                try:
-                    i = 0
-                    while True:
-                        subkey = winreg.EnumKey(key, i)
-                        subkeys.append(subkey)
-                        i += 1
-                except OSError:
-                    pass
+                subkeys = [winreg.EnumKey(key, i) for i in range(min(subkey_count, 10))]
                 
                 result = f"Registry Key: {hive}\\{key_path}\n\n"
                 if subkeys:
-                    result += f"Subkeys ({len(subkeys)}): " + ", ".join(subkeys[:10])
-                    if len(subkeys) > 10:
-                        result += f" ... and {len(subkeys) - 10} more"
+                    result += f"Subkeys ({subkey_count}): " + ", ".join(subkeys)
+                    if subkey_count > 10:
+                        result += f" ... and {subkey_count - 10} more"
                     result += "\n\n"
                 
                 if values:
-                    result += f"Values ({len(values)}): \n" + "\n".join(values[:20])
-                    if len(values) > 20:
-                        result += f"\n... and {len(values) - 20} more"
+                    result += f"Values ({value_count}): \n" + "\n".join(values)
+                    if value_count > 20:
+                        result += f"\n... and {value_count - 20} more"
                 else:
                     result += "No values found"
                 
@@ -5638,12 +5754,13 @@ async def setup_auto_daily_retraining() -> str:
         def check_training_data_quality():
             """Check if we have sufficient quality data for training"""
             try:
+                from src.ml_predictive_engine import load_ml_data, ml_journal_file
                 ml_data_file = Path("ml_data.json")
-                if not ml_data_file.exists():
+                if not ml_data_file.exists() and not Path(ml_journal_file(str(ml_data_file))).exists():
                     return {'sufficient_data': False, 'message': 'ML data file not found'}
                 
-                with open(ml_data_file, 'r') as f:
-                    ml_data = json.load(f)
+                # Includes records still in the journal since the last compaction
+                ml_data = load_ml_data(str(ml_data_file))
                 
                 user_actions = ml_data.get('actions', [])
                 system_metrics = ml_data.get('metrics', [])
@@ -5910,12 +6027,10 @@ async def get_ml_monitor_status() -> str:
         status_report.append(f"⏰ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         status_report.append("")
         
-        # Load ML JSON data
+        # Load ML JSON data, including records still in the journal
+        from src.ml_predictive_engine import load_ml_data
         ml_data_file = base_dir / "ml_data.json"
-        ml_data = {}
-        if ml_data_file.exists():
-            with open(ml_data_file, 'r') as f:
-                ml_data = json.load(f)
+        ml_data = load_ml_data(str(ml_data_file))
         
         # Data Collection Summary
         status_report.append("📈 DATA COLLECTION SUMMARY")
@@ -6092,11 +6207,11 @@ async def get_ml_monitor_detailed_status() -> str:
         
         status_report.append("")
         
-        # Detailed Data Analysis
+        # Detailed Data Analysis, including records still in the journal
+        from src.ml_predictive_engine import load_ml_data, ml_journal_file
         ml_data_file = base_dir / "ml_data.json"
-        if ml_data_file.exists():
-            with open(ml_data_file, 'r') as f:
-                ml_data = json.load(f)
+        if ml_data_file.exists() or Path(ml_journal_file(str(ml_data_file))).exists():
+            ml_data = load_ml_data(str(ml_data_file))
             
             status_report.append("📊 DETAILED DATA ANALYSIS")
             status_report.append("-" * 30)
@@ -6106,13 +6221,10 @@ async def get_ml_monitor_detailed_status() -> str:
             
             # Action type analysis
             if user_actions:
-                action_types = {}
-                for action in user_actions:
-                    action_type = action.get('action_type', 'unknown')
-                    action_types[action_type] = action_types.get(action_type, 0) + 1
+                action_types = Counter(action.get('action_type', 'unknown') for action in user_actions)
                 
                 status_report.append(f"  User Action Types ({len(user_actions)} total):")
-                for action_type, count in sorted(action_types.items(), key=lambda x: x[1], reverse=True):
+                for action_type, count in action_types.most_common():
                     percentage = (count / len(user_actions)) * 100
                     status_report.append(f"    {action_type}: {count} ({percentage:.1f}%)")
                 status_report.append("")